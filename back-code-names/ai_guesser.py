@@ -0,0 +1,43 @@
+import numpy as np
+
+from embeddings import WordEmbeddings
+
+
+class AIGuesser:
+    """
+    Agent (devineur) automatique : classe les mots non révélés selon leur
+    similarité cosinus avec l'indice courant, sans aucun appel réseau.
+    """
+
+    def __init__(self, embeddings=None, temperature=0.1):
+        self.embeddings = embeddings if embeddings is not None else WordEmbeddings.load_default()
+        self.temperature = temperature
+
+    def rank_guesses(self, keyword, unrevealed_words):
+        """
+        Retourne la liste [(mot, confiance, similarité), ...] triée par confiance décroissante.
+        La confiance est un softmax des similarités sur l'ensemble des mots non révélés.
+        """
+        if not unrevealed_words:
+            return []
+        clue_vector = self.embeddings.encode([keyword])[0]
+        similarities = self.embeddings.encode(unrevealed_words) @ clue_vector
+        scaled = (similarities - similarities.max()) / self.temperature
+        confidences = np.exp(scaled)
+        confidences /= confidences.sum()
+        order = np.argsort(-similarities, kind='stable')
+        return [
+            (unrevealed_words[i], float(confidences[i]), float(similarities[i]))
+            for i in order
+        ]
+
+    def suggest(self, game, top_k=None):
+        """
+        Propose les devinettes pour l'indice courant de la partie
+        (`keyword`, `number_gess_given`). Par défaut, autant de mots que
+        l'indice en annonce (au moins 1).
+        """
+        ranked = self.rank_guesses(game.keyword, game._get_all_unrevealed_words())
+        if top_k is None:
+            top_k = max(game.number_gess_given, 1)
+        return ranked[:top_k]
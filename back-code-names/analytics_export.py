@@ -0,0 +1,226 @@
+"""
+Export analytique des parties sauvegardées (plateaux, indices, devinettes, résultats)
+en fichiers colonnes, par parties de taille bornée.
+
+Usage : python analytics_export.py [--games-dir games] [--out exports] [--full]
+
+Le pipeline est une suite de générateurs (fichiers -> parties -> lignes -> parts),
+la mémoire utilisée est donc bornée par `rows_per_part`, quel que soit le nombre
+de parties. Seules les parties modifiées depuis le dernier export sont relues,
+sauf avec --full ; une partie réexportée apparaît à nouveau avec un `updated_at`
+plus récent, la dernière version fait foi.
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+import uuid
+
+from game_logic import Game
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Sans pyarrow, export en CSV découpé par colonnes
+    pa = None
+    pq = None
+
+STATE_FILE = "_export_state.json"
+
+# Un seul export à la fois dans le processus (appels concurrents de POST /export)
+_export_lock = threading.Lock()
+
+# Colonnes et types de chaque table. Le schéma Parquet est explicite : une part
+# dont une colonne ne contient que des None (winner, keyword...) garde le même
+# type que les autres et le répertoire se relit comme un seul jeu de données.
+TABLE_TYPES = {
+    "games": {
+        "game_id": "string", "updated_at": "float64", "board_size": "int64", "current_player": "string",
+        "red_score": "int64", "blue_score": "int64", "red_cards_total": "int64", "blue_cards_total": "int64",
+        "game_over": "bool", "winner": "string", "moves": "int64",
+    },
+    "cells": {"game_id": "string", "row": "int64", "col": "int64", "word": "string", "color": "string", "revealed": "bool"},
+    "moves": {
+        "game_id": "string", "seq": "int64", "type": "string", "player": "string", "keyword": "string",
+        "number": "int64", "word": "string", "color": "string", "outcome": "string", "fallback": "bool",
+    },
+}
+
+TABLE_COLUMNS = {table: list(types) for table, types in TABLE_TYPES.items()}
+
+TABLE_SCHEMAS = {
+    table: pa.schema([(name, pa.type_for_alias(alias)) for name, alias in types.items()])
+    for table, types in TABLE_TYPES.items()
+} if pa is not None else {}
+
+
+def iter_game_files(games_dir, since=0.0):
+    """Génère (chemin, mtime) des sauvegardes modifiées après `since`."""
+    with os.scandir(games_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            mtime = entry.stat().st_mtime
+            if mtime >= since:
+                yield entry.path, mtime
+
+
+def iter_games(game_files):
+    """Génère (Game, mtime) pour chaque sauvegarde lisible ; les fichiers invalides sont ignorés."""
+    for path, mtime in game_files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                yield Game.from_json_string(f.read()), mtime
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Sauvegarde ignorée '{path}' : {e}")
+
+
+def _move_outcome(move):
+    if move['type'] != 'guess':
+        return None
+    if move['color'] == move['player']:
+        return 'correct'
+    if move['color'] in ('neutral', 'assassin'):
+        return move['color']
+    return 'opponent'
+
+
+def iter_rows(games):
+    """Génère (table, ligne) pour les tables games, cells et moves."""
+    for game, mtime in games:
+        size = game.board_size
+        yield "games", {
+            "game_id": game.id_game,
+            "updated_at": mtime,
+            "board_size": size,
+            "current_player": game.current_player,
+            "red_score": game.red_score,
+            "blue_score": game.blue_score,
+            "red_cards_total": game.red_cards_total,
+            "blue_cards_total": game.blue_cards_total,
+            "game_over": game.game_over,
+            "winner": game.winner,
+            "moves": len(game.history),
+        }
+        for r in range(size):
+            for c in range(size):
+                yield "cells", {
+                    "game_id": game.id_game,
+                    "row": r,
+                    "col": c,
+                    "word": game.word_matrix[r][c],
+                    "color": game.color_matrix[r][c],
+                    "revealed": game.revealed_matrix[r][c],
+                }
+        for seq, move in enumerate(game.history):
+            yield "moves", {
+                "game_id": game.id_game,
+                "seq": seq,
+                "type": move['type'],
+                "player": move['player'],
+                "keyword": move.get('keyword'),
+                "number": move.get('number'),
+                "word": move.get('word'),
+                "color": move.get('color'),
+                "outcome": _move_outcome(move),
+                "fallback": move.get('fallback', False),
+            }
+
+
+class ColumnarPartWriter:
+    """
+    Accumule les lignes d'une table colonne par colonne et écrit un fichier
+    (Parquet si pyarrow est disponible, sinon CSV) tous les `rows_per_part` lignes.
+    """
+
+    def __init__(self, out_dir, table, run_id, rows_per_part):
+        self.dir = os.path.join(out_dir, table)
+        os.makedirs(self.dir, exist_ok=True)
+        self.columns = TABLE_COLUMNS[table]
+        self.schema = TABLE_SCHEMAS.get(table)
+        self.run_id = run_id
+        self.rows_per_part = rows_per_part
+        self.buffer = {name: [] for name in self.columns}
+        self.buffered = 0
+        self.parts = []
+
+    def append(self, row):
+        for name in self.columns:
+            self.buffer[name].append(row[name])
+        self.buffered += 1
+        if self.buffered >= self.rows_per_part:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        base = os.path.join(self.dir, f"part-{self.run_id}-{len(self.parts):05d}")
+        if pq is not None:
+            path = base + ".parquet"
+            pq.write_table(pa.table(self.buffer, schema=self.schema), path)
+        else:
+            path = base + ".csv"
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                writer.writerows(zip(*(self.buffer[name] for name in self.columns)))
+        self.parts.append(path)
+        self.buffer = {name: [] for name in self.columns}
+        self.buffered = 0
+
+
+def export_games(games_dir, out_dir, rows_per_part=50000, full=False):
+    """
+    Exporte les parties de `games_dir` vers `out_dir`.
+    Retourne un résumé (nombre de parties et de lignes, fichiers écrits).
+    Les exports sont sérialisés ; chaque exécution a un identifiant unique,
+    ses fichiers n'écrasent donc jamais ceux d'une autre.
+    """
+    with _export_lock:
+        return _export_games(games_dir, out_dir, rows_per_part, full)
+
+
+def _export_games(games_dir, out_dir, rows_per_part, full):
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, STATE_FILE)
+    since = 0.0
+    if not full and os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            since = json.load(f)['last_run_started_at']
+
+    started_at = time.time()
+    run_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(started_at))}-{uuid.uuid4().hex[:8]}"
+    writers = {table: ColumnarPartWriter(out_dir, table, run_id, rows_per_part) for table in TABLE_COLUMNS}
+    rows = {table: 0 for table in TABLE_COLUMNS}
+
+    for table, row in iter_rows(iter_games(iter_game_files(games_dir, since))):
+        writers[table].append(row)
+        rows[table] += 1
+    for writer in writers.values():
+        writer.flush()
+
+    # Les fichiers modifiés pendant l'export seront repris au prochain passage
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump({'last_run_started_at': started_at}, f)
+
+    summary = {
+        "run_id": run_id,
+        "incremental": since > 0,
+        "games": rows["games"],
+        "rows": rows,
+        "files": [path for writer in writers.values() for path in writer.parts],
+    }
+    print(f"Export terminé : {rows['games']} parties, {sum(rows.values())} lignes.")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export analytique des parties sauvegardées.")
+    parser.add_argument("--games-dir", default="games")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--rows-per-part", type=int, default=50000)
+    parser.add_argument("--full", action="store_true", help="Réexporter toutes les parties")
+    args = parser.parse_args()
+    export_games(args.games_dir, args.out, rows_per_part=args.rows_per_part, full=args.full)
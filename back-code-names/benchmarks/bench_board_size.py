@@ -0,0 +1,63 @@
+"""
+Coût d'une devinette selon la taille du plateau, sur le chemin d'une requête.
+
+Usage : python benchmarks/bench_board_size.py [--sizes 5 8 12 16 20]
+
+Pour chaque taille, une partie est créée puis des cases sont révélées une à une,
+comme le fait le serveur : chaque devinette recharge la partie depuis sa
+sauvegarde JSON (from_json_string), joue le mot (process_guess) et la
+resérialise (to_json_string) ; on mesure le coût moyen de chaque étape.
+Le chargement reste en O(cases) (analyse JSON et index du plateau) ;
+process_guess ne doit pas dépendre de la taille du plateau.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import Game
+
+
+def bench_size(board_size, guesses):
+    words = [f"MOT{i}" for i in range(board_size * board_size)]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        saved = Game(words, board_size=board_size).to_json_string()
+        order = random.sample(words, min(guesses, len(words)))
+
+        load_time = guess_time = save_time = 0.0
+        for word in order:
+            t0 = time.perf_counter()
+            game = Game.from_json_string(saved)
+            t1 = time.perf_counter()
+            game.process_guess(word)
+            game.game_over = False # On continue jusqu'au bout du plateau
+            t2 = time.perf_counter()
+            saved = game.to_json_string()
+            t3 = time.perf_counter()
+            load_time += t1 - t0
+            guess_time += t2 - t1
+            save_time += t3 - t2
+
+    n = len(order)
+    return load_time / n, guess_time / n, save_time / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 8, 12, 16, 20])
+    parser.add_argument("--guesses", type=int, default=25, help="Devinettes mesurées par plateau")
+    args = parser.parse_args()
+
+    print(f"{'plateau':>8} {'from_json_string':>17} {'process_guess':>15} {'to_json_string':>15} {'total':>12}")
+    for size in args.sizes:
+        load, guess, save = bench_size(size, args.guesses)
+        print(f"{size:>5}x{size:<2} {load * 1e6:>14.1f} µs {guess * 1e6:>12.1f} µs {save * 1e6:>12.1f} µs "
+              f"{(load + guess + save) * 1e6:>9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
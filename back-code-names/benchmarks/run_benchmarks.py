@@ -0,0 +1,191 @@
+"""
+Micro-benchmarks de game_logic et du stockage, avec comparaison à une référence.
+
+Usage :
+    python benchmarks/run_benchmarks.py                       # mesure et affiche
+    python benchmarks/run_benchmarks.py --save v3             # enregistre baselines/v3.json
+    python benchmarks/run_benchmarks.py --compare v3          # compare à baselines/v3.json
+    python benchmarks/run_benchmarks.py --compare v3 --threshold 0.15 --threshold store_save[always]=0.5
+
+Avec --compare, le script sort en erreur (code 1) si une mesure dépasse la
+référence de plus que son seuil (fraction de la médiane, 0.10 par défaut).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import Game
+from storage import FileGameStore, FSYNC_POLICIES
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+BASELINE_FORMAT = 1
+WORDS = [f"MOT{i}" for i in range(Game.BOARD_SIZE * Game.BOARD_SIZE)]
+
+
+def measure(fn, setup=None, repeat=7, number=200):
+    """
+    Exécute `repeat` séries de `number` appels à fn(état) et retourne le temps
+    par appel (µs) de chaque série. `setup()` prépare un état neuf par appel,
+    hors mesure.
+    """
+    samples = []
+    for _ in range(repeat):
+        states = [setup() for _ in range(number)] if setup else [None] * number
+        t0 = time.perf_counter()
+        for state in states:
+            fn(state)
+        samples.append((time.perf_counter() - t0) / number * 1e6)
+    return samples
+
+
+def bench_game_logic():
+    results = {}
+    results["game_construction"] = measure(lambda _: Game(WORDS))
+
+    def fresh_game():
+        return Game(WORDS)
+    results["find_word_coords"] = measure(lambda g: g._find_word_coords(random.choice(WORDS)), setup=fresh_game)
+
+    def game_and_word():
+        return Game(WORDS), random.choice(WORDS)
+    results["process_guess"] = measure(lambda s: s[0].process_guess(s[1]), setup=game_and_word)
+
+    def half_revealed_game():
+        game = Game(WORDS)
+        for word in random.sample(WORDS, len(WORDS) // 2):
+            game.process_guess(word)
+            game.game_over = False
+        return game
+    results["get_remaining_words"] = measure(lambda g: g._get_remaining_words(g.current_player), setup=half_revealed_game)
+    results["json_roundtrip"] = measure(lambda g: Game.from_json_string(g.to_json_string()), setup=half_revealed_game)
+    return results
+
+
+def bench_storage(repeat=5, number=50):
+    """save/load via FileGameStore, pour chaque politique de fsync (parties sauvegardées en parallèle)."""
+    results = {}
+
+    async def run(policy, directory):
+        store = FileGameStore(directory, fsync_policy=policy)
+        games = [Game(WORDS) for _ in range(number)]
+        save_samples, load_samples = [], []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            await asyncio.gather(*[store.save(g) for g in games])
+            t1 = time.perf_counter()
+            await asyncio.gather(*[store.load(g.id_game) for g in games])
+            t2 = time.perf_counter()
+            save_samples.append((t1 - t0) / number * 1e6)
+            load_samples.append((t2 - t1) / number * 1e6)
+        await store.close()
+        return save_samples, load_samples
+
+    for policy in FSYNC_POLICIES:
+        with tempfile.TemporaryDirectory() as directory:
+            save_samples, load_samples = asyncio.run(run(policy, directory))
+        results[f"store_save[{policy}]"] = save_samples
+        results[f"store_load[{policy}]"] = load_samples
+    return results
+
+
+def summarize(samples):
+    return {"median_us": round(statistics.median(samples), 3), "min_us": round(min(samples), 3)}
+
+
+def run_all():
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        raw = {**bench_game_logic(), **bench_storage()}
+    return {name: summarize(samples) for name, samples in raw.items()}
+
+
+def baseline_path(name):
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def save_baseline(name, results):
+    os.makedirs(BASELINES_DIR, exist_ok=True)
+    data = {
+        "format": BASELINE_FORMAT,
+        "name": name,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(baseline_path(name), 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    print(f"Référence enregistrée dans '{baseline_path(name)}'.")
+
+
+def load_baseline(name):
+    with open(baseline_path(name), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"Format de référence non supporté : {data.get('format')}")
+    return data["results"]
+
+
+def compare(results, baseline, default_threshold, thresholds):
+    """Affiche la comparaison et retourne la liste des benchmarks en régression."""
+    regressions = []
+    print(f"{'benchmark':<24} {'référence':>12} {'actuel':>12} {'écart':>8}  seuil")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:<24} {'-':>12} {current['median_us']:>9.2f} µs {'nouveau':>8}")
+            continue
+        reference = baseline[name]["median_us"]
+        delta = (current["median_us"] - reference) / reference if reference else 0.0
+        threshold = thresholds.get(name, default_threshold)
+        flag = "  RÉGRESSION" if delta > threshold else ""
+        print(f"{name:<24} {reference:>9.2f} µs {current['median_us']:>9.2f} µs {delta:>+7.1%}  {threshold:.0%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def parse_thresholds(values):
+    default, per_benchmark = 0.10, {}
+    for value in values:
+        if "=" in value:
+            name, _, fraction = value.rpartition("=")
+            per_benchmark[name] = float(fraction)
+        else:
+            default = float(value)
+    return default, per_benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de game_logic et du stockage.")
+    parser.add_argument("--save", metavar="NOM", help="Enregistrer les résultats comme référence baselines/NOM.json")
+    parser.add_argument("--compare", metavar="NOM", help="Comparer à la référence baselines/NOM.json")
+    parser.add_argument("--threshold", action="append", default=[],
+                        help="Seuil de régression : 0.15 (tous) ou nom=0.5 (un benchmark)")
+    args = parser.parse_args()
+
+    results = run_all()
+    if args.compare:
+        default_threshold, thresholds = parse_thresholds(args.threshold)
+        regressions = compare(results, load_baseline(args.compare), default_threshold, thresholds)
+    else:
+        regressions = []
+        for name, result in results.items():
+            print(f"{name:<24} {result['median_us']:>9.2f} µs (min {result['min_us']:.2f} µs)")
+    if args.save:
+        save_baseline(args.save, results)
+    if regressions:
+        print(f"{len(regressions)} régression(s) : {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Construction hors ligne de l'index de vecteurs de mots.
+
+Usage : python build_vocab.py cc.fr.300.vec --out word_index [--max-words 200000]
+
+Le fichier source est un fichier texte standard (word2vec/fastText/GloVe :
+'mot v1 v2 ...', avec ou sans ligne d'en-tête 'N D'). Le vocabulaire est
+normalisé (majuscules, Unicode NFC : FORÊT, BIBLIOTHÈQUE), restreint aux mots
+simples (lettres, accents compris) et dédoublonné sur la forme sans accents
+(on garde la première occurrence, la plus fréquente dans ces fichiers).
+Les vecteurs sont normalisés L2 et écrits en float16 :
+
+    word_index/vectors.f16.npy   matrice (mots, dimension), chargeable en mmap
+    word_index/vocab.txt         un mot par ligne, dans l'ordre des lignes
+    word_index/keys.txt          forme repliée (normalize_word) de chaque mot,
+                                 pour que le chargement n'ait rien à recalculer
+    word_index/meta.json         dimension, nombre de mots, source
+
+Les workers chargent l'index avec WordEmbeddings.from_index (np.load en
+mmap_mode='r') : temps de chargement quasi nul et pages partagées entre
+processus via le cache du système.
+"""
+import argparse
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from game_logic import normalize_word
+
+INDEX_FORMAT = 2
+VECTORS_FILE = "vectors.f16.npy"
+VOCAB_FILE = "vocab.txt"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+LETTERS_RE = re.compile(r"^[^\W\d_]+$")
+
+
+def normalize_vocab_word(word):
+    """Forme affichée d'un mot du vocabulaire : majuscules, composée (NFC)."""
+    return unicodedata.normalize('NFC', word.strip()).upper()
+
+
+def _iter_vector_lines(path):
+    """Génère (numéro de ligne, mot, reste de la ligne) en sautant l'en-tête éventuel."""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line_no, line in enumerate(f):
+            word, _, values = line.rstrip('\n').partition(' ')
+            if line_no == 0 and values.count(' ') == 0 and word.isdigit():
+                continue # En-tête "N D"
+            yield line_no, word, values
+
+
+def select_vocabulary(path, max_words=None, min_length=2, max_length=30):
+    """
+    Premier passage : choisit les lignes à garder.
+    Retourne ({numéro de ligne: (mot normalisé, forme repliée)}, dimension).
+    Les lignes dont le nombre de valeurs diffère de la dimension (mot contenant
+    une espace, 'new york 0.1 ...', ou ligne tronquée) sont ignorées.
+    """
+    selected = {}
+    seen = set()
+    dim = None
+    for line_no, word, values in _iter_vector_lines(path):
+        if dim is None:
+            dim = len(values.split())
+        elif len(values.split()) != dim:
+            continue
+        word = normalize_vocab_word(word)
+        if not (min_length <= len(word) <= max_length) or not LETTERS_RE.match(word):
+            continue
+        key = normalize_word(word)
+        if key in seen:
+            continue
+        seen.add(key)
+        selected[line_no] = (word, key)
+        if max_words and len(selected) >= max_words:
+            break
+    return selected, dim
+
+
+def build_index(source, out_dir, max_words=None, min_length=2):
+    selected, dim = select_vocabulary(source, max_words, min_length)
+    if not selected:
+        raise ValueError(f"Aucun mot retenu dans '{source}'.")
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Second passage : écriture directe dans la matrice mappée, ligne par ligne
+    matrix = np.lib.format.open_memmap(
+        os.path.join(out_dir, VECTORS_FILE), mode='w+', dtype=np.float16, shape=(len(selected), dim)
+    )
+    row = 0
+    last_line = max(selected)
+    with open(os.path.join(out_dir, VOCAB_FILE), 'w', encoding='utf-8') as vocab, \
+            open(os.path.join(out_dir, KEYS_FILE), 'w', encoding='utf-8') as keys:
+        for line_no, _, values in _iter_vector_lines(source):
+            if line_no in selected:
+                vector = np.asarray(values.split(), dtype=np.float32)
+                if vector.shape[0] != dim:
+                    raise ValueError(f"Ligne {line_no + 1} : dimension {vector.shape[0]} au lieu de {dim}.")
+                norm = np.linalg.norm(vector)
+                matrix[row] = vector / norm if norm else vector
+                word, key = selected[line_no]
+                vocab.write(word + "\n")
+                keys.write(key + "\n")
+                row += 1
+            if line_no >= last_line:
+                break
+    matrix.flush()
+    del matrix
+
+    meta = {"format": INDEX_FORMAT, "dim": dim, "words": row, "source": os.path.basename(source)}
+    with open(os.path.join(out_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    print(f"Index écrit dans '{out_dir}' : {row} mots, dimension {dim}.")
+    return meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit l'index float16 des vecteurs de mots.")
+    parser.add_argument("source", help="Fichier de vecteurs au format texte")
+    parser.add_argument("--out", default="word_index")
+    parser.add_argument("--max-words", type=int, default=200000)
+    parser.add_argument("--min-length", type=int, default=2)
+    args = parser.parse_args()
+    build_index(args.source, args.out, args.max_words, args.min_length)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import re
+
+from game_logic import CLUE_DECORATION_RE, Game, request_completion
+
+# Ligne de réponse attendue pour chaque plateau : "PLATEAU 3: MOT, CHIFFRE; MOT, CHIFFRE"
+BOARD_ANSWER_RE = re.compile(r"^\s*PLATEAU\s*(\d+)\s*[:\-]\s*(.+?)\s*$", re.IGNORECASE)
+
+
+def build_batch_prompt(games, candidates=Game.CLUE_CANDIDATES):
+    """Regroupe les plateaux de plusieurs parties dans un seul prompt structuré."""
+    lines = [
+        "Vous êtes l'espion dans plusieurs parties indépendantes de Codenames.",
+        "Pour chaque plateau ci-dessous, proposez plusieurs indices candidats où MOT est un seul mot "
+        "qui n'est PAS sur ce plateau et CHIFFRE est le nombre de mots de l'équipe indiquée qui sont liés à MOT.",
+        "",
+    ]
+    for i, game in enumerate(games, start=1):
+        lines.append(f"PLATEAU {i} (équipe {game.current_player})")
+        lines.append(f"Mots de l'équipe : {', '.join(game._get_remaining_words(game.current_player))}")
+        lines.append(f"Tous les mots du plateau : {', '.join(game._get_all_unrevealed_words())}")
+        lines.append("")
+    lines.append(
+        "Répondez avec exactement une ligne par plateau, au format "
+        f"'PLATEAU n: MOT, CHIFFRE; MOT, CHIFFRE; ...' ({candidates} candidats, du meilleur au moins bon), "
+        "sans aucun autre texte."
+    )
+    return "\n".join(lines)
+
+
+def parse_batch_response(text, board_count):
+    """
+    Découpe la réponse groupée de l'IA.
+    Retourne un dictionnaire {indice du plateau (0-based): 'MOT, CHIFFRE; ...'}.
+    Les lignes mal formées, hors limites ou en double sont ignorées.
+    """
+    answers = {}
+    for line in text.splitlines():
+        match = BOARD_ANSWER_RE.match(CLUE_DECORATION_RE.sub("", line)) # **PLATEAU 1**: ...
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if 0 <= index < board_count and index not in answers:
+            answers[index] = match.group(2)
+    return answers
+
+
+class ClueBatcher:
+    """
+    Micro-batching des demandes d'indice de plusieurs parties en une seule requête à l'IA.
+    Le ClueScheduler accumule les demandes pendant `window` secondes (au plus
+    `max_batch_size` parties) puis appelle `run_batch`.
+    """
+
+    def __init__(self, window=0.05, max_batch_size=8, tokens_per_board=30):
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.tokens_per_board = tokens_per_board
+
+    @classmethod
+    def from_env(cls):
+        """Construit un batcher à partir des variables d'environnement CLUE_BATCH_*."""
+        return cls(
+            window=float(os.getenv("CLUE_BATCH_WINDOW", "0.05")),
+            max_batch_size=int(os.getenv("CLUE_BATCH_MAX_SIZE", "8")),
+        )
+
+    def run_batch(self, games):
+        """
+        Obtient les indices de toutes les parties en un seul appel et les applique à chaque Game.
+        Retourne la liste des parties dont la réponse est absente ou invalide :
+        elles doivent être traitées par une requête individuelle (Game.get_clue).
+        """
+        try:
+            text = request_completion(
+                build_batch_prompt(games),
+                max_tokens=self.tokens_per_board * len(games) + 10,
+            )
+        except Exception as e:
+            print(f"Erreur lors de l'appel groupé à l'API OpenAI : {e}")
+            return list(games)
+
+        answers = parse_batch_response(text, len(games))
+        failed = []
+        for i, game in enumerate(games):
+            if i not in answers or game.apply_clue_text(answers[i]) is None:
+                print(f"Réponse groupée invalide pour la partie {game.id_game}, requête individuelle.")
+                failed.append(game)
+        print(f"Lot de {len(games)} indices : {len(games) - len(failed)} valides.")
+        return failed
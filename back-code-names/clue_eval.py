@@ -0,0 +1,213 @@
+"""
+Évaluation hors ligne des fournisseurs d'indices : qualité et latence ensemble.
+
+Usage :
+    python clue_eval.py --providers openai local --corpus games ../save_game_test.json
+
+Chaque plateau du corpus (sauvegardes `games/*.json` ou fichiers au format de
+`save_game_test.json`) est rejoué auprès de chaque fournisseur, en parallèle.
+Chaque indice est ensuite joué par un devineur de référence (AIGuesser) :
+- valide : un seul mot, absent du plateau (accents/casse compris), nombre >= 1 ;
+- devinettes correctes : mots de l'équipe trouvés avant la première erreur,
+  parmi les `nombre` premiers mots proposés par le devineur ;
+- latence : p50 / p90 / p99 des appels au fournisseur.
+
+Le devineur de référence exige de vrais vecteurs de mots (--guesser-vectors,
+sinon WORD_VECTORS_INDEX / WORD_VECTORS_PATH) : avec le repli par n-grammes,
+il mesurerait la ressemblance orthographique et non le sens. Pour ne pas
+avantager le fournisseur `local`, utiliser de préférence des vecteurs
+différents de ceux de l'espion local.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import re
+import statistics
+import time
+
+from game_logic import Game, normalize_word, request_completion
+from ai_guesser import AIGuesser
+from embeddings import WordEmbeddings
+
+SINGLE_WORD_RE = re.compile(r"^[^\W\d_]+(?:['’-][^\W\d_]+)*$")
+
+
+def openai_provider():
+    # Appel direct (sans Game.get_clue, qui avale les exceptions) : les erreurs
+    # de l'API remontent au harnais et sont comptées comme erreurs, pas comme indices invalides
+    def give_clue(game):
+        clue_text = request_completion(game.build_clue_prompt(), max_tokens=10 * game.CLUE_CANDIDATES)
+        return game.apply_clue_text(clue_text)
+    return give_clue
+
+
+def local_provider():
+    from local_spymaster import LocalSpymaster
+    return LocalSpymaster().give_clue
+
+
+PROVIDERS = {
+    "openai": openai_provider,
+    "local": local_provider,
+}
+
+
+def load_corpus(paths, limit=None):
+    """Charge les plateaux encore en jeu depuis des fichiers JSON ou des répertoires de sauvegardes."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json")))
+        else:
+            files.append(path)
+
+    boards = []
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Les fixtures n'ont pas forcément d'identifiant
+            data.setdefault('id_game', os.path.splitext(os.path.basename(path))[0])
+            game = Game(load_data=data)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Plateau ignoré '{path}' : {e}")
+            continue
+        if not game.game_over and game._get_remaining_words(game.current_player):
+            boards.append(game.to_json_string())
+        if limit and len(boards) >= limit:
+            break
+    return boards
+
+
+def is_valid_clue(game, clue):
+    if not clue:
+        return False
+    keyword, number = clue
+    board_words = {normalize_word(w) for row in game.word_matrix for w in row}
+    return (SINGLE_WORD_RE.match(keyword) is not None
+            and normalize_word(keyword) not in board_words
+            and number >= 1)
+
+
+def correct_guesses(game, clue, guesser):
+    """Nombre de mots de l'équipe trouvés par le devineur de référence avant sa première erreur."""
+    game.keyword, game.number_gess_given = clue
+    team_words = set(game._get_remaining_words(game.current_player))
+    correct = 0
+    for word, _, _ in guesser.suggest(game):
+        if word not in team_words:
+            break
+        correct += 1
+    return correct
+
+
+def load_guesser_embeddings(path=None):
+    """Vecteurs du devineur de référence : index (répertoire) ou fichier texte, sinon ceux par défaut."""
+    if path is None:
+        return WordEmbeddings.load_default()
+    if os.path.isdir(path):
+        return WordEmbeddings.from_index(path)
+    return WordEmbeddings.from_text_file(path, limit=int(os.getenv("WORD_VECTORS_LIMIT", "200000")))
+
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+async def evaluate_provider(name, give_clue, boards, guesser, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def evaluate_board(board_json):
+        game = Game.from_json_string(board_json)
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                clue = await asyncio.to_thread(give_clue, game)
+                error = None
+            except Exception as e:
+                clue, error = None, str(e)
+            latency = time.perf_counter() - t0
+        valid = is_valid_clue(game, clue)
+        return {
+            "valid": valid,
+            "number": clue[1] if valid else 0,
+            "correct": correct_guesses(game, clue, guesser) if valid else 0,
+            "latency": latency,
+            "error": error,
+        }
+
+    results = await asyncio.gather(*[evaluate_board(b) for b in boards])
+    latencies_ms = [r["latency"] * 1000 for r in results]
+    valid = [r for r in results if r["valid"]]
+    return {
+        "provider": name,
+        "guesser_embeddings": guesser.embeddings.source,
+        "boards": len(results),
+        "validity_rate": len(valid) / len(results),
+        "mean_number": statistics.mean(r["number"] for r in valid) if valid else 0.0,
+        "mean_correct": statistics.mean(r["correct"] for r in results),
+        "errors": sum(1 for r in results if r["error"]),
+        "latency_p50_ms": percentile(latencies_ms, 0.50),
+        "latency_p90_ms": percentile(latencies_ms, 0.90),
+        "latency_p99_ms": percentile(latencies_ms, 0.99),
+    }
+
+
+def print_report(reports):
+    if reports:
+        print(f"Devineur de référence : vecteurs '{reports[0]['guesser_embeddings']}'")
+    print(f"{'fournisseur':<12} {'plateaux':>8} {'valides':>8} {'nombre':>7} {'correctes':>10} "
+          f"{'erreurs':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for r in reports:
+        print(f"{r['provider']:<12} {r['boards']:>8} {r['validity_rate']:>8.0%} {r['mean_number']:>7.2f} "
+              f"{r['mean_correct']:>10.2f} {r['errors']:>8} {r['latency_p50_ms']:>8.1f} "
+              f"{r['latency_p90_ms']:>8.1f} {r['latency_p99_ms']:>8.1f}")
+
+
+async def run_evaluation(provider_names, boards, concurrency, guesser):
+    reports = []
+    for name in provider_names:
+        give_clue = PROVIDERS[name]()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            reports.append(await evaluate_provider(name, give_clue, boards, guesser, concurrency))
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évaluation hors ligne des fournisseurs d'indices.")
+    parser.add_argument("--providers", nargs="+", default=["openai"], choices=sorted(PROVIDERS))
+    parser.add_argument("--corpus", nargs="+", default=["games"], help="Fichiers JSON ou répertoires de sauvegardes")
+    parser.add_argument("--limit", type=int, default=None, help="Nombre maximal de plateaux")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", metavar="FICHIER", help="Écrire aussi le rapport en JSON")
+    parser.add_argument("--guesser-vectors", metavar="CHEMIN",
+                        help="Index (build_vocab.py) ou fichier de vecteurs du devineur de référence")
+    args = parser.parse_args()
+
+    embeddings = load_guesser_embeddings(args.guesser_vectors)
+    if not embeddings.words:
+        parser.error("Le devineur de référence nécessite de vrais vecteurs de mots "
+                     "(--guesser-vectors, WORD_VECTORS_INDEX ou WORD_VECTORS_PATH) : "
+                     "le repli par n-grammes ne mesure pas le sens des indices.")
+    if "local" in args.providers and args.guesser_vectors is None:
+        print("Attention : l'espion local et le devineur utilisent les mêmes vecteurs, "
+              "son score est optimiste (voir --guesser-vectors).")
+
+    boards = load_corpus(args.corpus, args.limit)
+    if not boards:
+        parser.error("Aucun plateau en cours de partie dans le corpus.")
+    print(f"{len(boards)} plateaux chargés.")
+    reports = asyncio.run(run_evaluation(args.providers, boards, args.concurrency, AIGuesser(embeddings)))
+    print_report(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
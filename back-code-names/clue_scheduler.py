@@ -0,0 +1,260 @@
+import asyncio
+import contextvars
+import itertools
+import os
+import time
+
+from tracing import span, current_trace_id
+
+# Classes de priorité (plus petit = plus prioritaire)
+PRIORITY_TURN = 0        # Tour en cours : des joueurs attendent l'indice
+PRIORITY_NEW_GAME = 1    # Indice d'ouverture d'une nouvelle partie
+PRIORITY_BACKGROUND = 2  # Travail spéculatif / en arrière-plan
+
+PRIORITY_NAMES = {
+    PRIORITY_TURN: "turn",
+    PRIORITY_NEW_GAME: "new_game",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class TokenBucket:
+    """
+    Limiteur de débit de type "token bucket".
+    `rate` jetons sont ajoutés par seconde, jusqu'à `capacity` jetons.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Attend qu'un jeton soit disponible puis le consomme."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class _ClueJob:
+    """Demande d'indice en attente dans la file du scheduler."""
+
+    __slots__ = ("game", "priority", "enqueued_at", "deadline", "future", "started", "shed", "context")
+
+    def __init__(self, game, priority, deadline, future):
+        # Contexte du demandeur : les spans de l'appel à l'IA rejoignent sa trace
+        self.context = contextvars.copy_context()
+        self.game = game
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.deadline = deadline
+        self.future = future
+        self.started = False
+        self.shed = False
+
+
+class ClueScheduler:
+    """
+    Ordonnanceur central des demandes d'indice à l'IA.
+    - plafond global de requêtes simultanées vers l'IA (`max_concurrency` workers)
+    - limite de débit par token bucket (`rate_per_second`, `burst`)
+    - classes de priorité : tour en cours > nouvelle partie > arrière-plan
+    - délestage : une demande restée en file plus de `queue_deadline` secondes
+      reçoit un indice dégradé (Game.set_fallback_clue) au lieu d'un appel à l'IA.
+    - regroupement optionnel (`batcher`, voir ClueBatcher) : un worker accumule
+      plusieurs demandes et les envoie à l'IA en une seule requête.
+    """
+
+    def __init__(self, max_concurrency=4, rate_per_second=5.0, burst=10, queue_deadline=8.0, batcher=None):
+        self.max_concurrency = max_concurrency
+        self.queue_deadline = queue_deadline
+        self.batcher = batcher
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self._queue = None
+        self._workers = []
+        self._counter = itertools.count()
+        self._queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self._in_flight = 0
+        self._completed = 0
+        self._shed = 0
+        self._failed = 0
+        self._batches = 0
+        self._batch_fallbacks = 0
+
+    @classmethod
+    def from_env(cls, batcher=None):
+        """Construit un scheduler à partir des variables d'environnement CLUE_*."""
+        return cls(
+            max_concurrency=int(os.getenv("CLUE_MAX_CONCURRENCY", "4")),
+            rate_per_second=float(os.getenv("CLUE_RATE_PER_SECOND", "5")),
+            burst=int(os.getenv("CLUE_RATE_BURST", "10")),
+            queue_deadline=float(os.getenv("CLUE_QUEUE_DEADLINE", "8")),
+            batcher=batcher,
+        )
+
+    def start(self):
+        """Démarre les workers (doit être appelé depuis la boucle asyncio)."""
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def stop(self):
+        """Arrête les workers ; les demandes encore en file sont délestées."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while self._queue is not None and not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            self._shed_job(job)
+
+    async def request_clue(self, game, priority=PRIORITY_TURN):
+        """
+        Demande un indice pour `game` et attend le résultat.
+        Retourne (mot-clé, nombre), ou None si l'IA n'a pas fourni d'indice valide.
+        Si la demande n'a pas démarré avant l'échéance, elle est délestée et
+        l'indice dégradé est retourné.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.queue_deadline
+        job = _ClueJob(game, priority, deadline, loop.create_future())
+        self._queued[priority] += 1
+        self._queue.put_nowait((priority, next(self._counter), job))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout=self.queue_deadline)
+        except asyncio.TimeoutError:
+            if not job.started:
+                self._shed_job(job)
+            # Une demande déjà démarrée n'est pas abandonnée : on attend sa réponse.
+            return await job.future
+
+    def _shed_job(self, job):
+        """Marque une demande comme délestée et lui attribue l'indice dégradé."""
+        if job.shed or job.future.done():
+            return
+        job.shed = True
+        self._queued[job.priority] -= 1
+        self._shed += 1
+        print(f"Demande d'indice délestée ({PRIORITY_NAMES[job.priority]}) pour la partie {job.game.id_game}.")
+        job.future.set_result(job.game.set_fallback_clue())
+
+    def _take_job(self, job):
+        """Retire une demande de la file ; retourne False si elle a été (ou est) délestée."""
+        if job.shed:
+            return False
+        if time.monotonic() > job.deadline:
+            self._shed_job(job)
+            return False
+        return True
+
+    async def _collect_batch(self, first_job):
+        """Accumule d'autres demandes en file pendant la fenêtre du batcher."""
+        jobs = [first_job]
+        window_end = time.monotonic() + self.batcher.window
+        while len(jobs) < self.batcher.max_batch_size:
+            while len(jobs) < self.batcher.max_batch_size and not self._queue.empty():
+                _, _, job = self._queue.get_nowait()
+                if self._take_job(job):
+                    jobs.append(job)
+            remaining = window_end - time.monotonic()
+            if len(jobs) >= self.batcher.max_batch_size or remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, self.batcher.window / 5))
+        return jobs
+
+    async def _worker(self):
+        while True:
+            # Jeton pris avant de retirer une demande : pendant l'attente du débit, les demandes
+            # restent dans la file de priorité et une demande plus urgente arrivée entre-temps passe devant.
+            await self.bucket.acquire()
+            jobs = []
+            while not jobs: # Le jeton est gardé tant qu'on ne retire que des demandes délestées
+                _, _, job = await self._queue.get()
+                if not self._take_job(job):
+                    continue
+                if self.batcher is not None and self.batcher.max_batch_size > 1:
+                    jobs = await self._collect_batch(job)
+                else:
+                    jobs = [job]
+                jobs = [job for job in jobs if not job.shed]
+
+            for job in jobs:
+                job.started = True
+                self._queued[job.priority] -= 1
+            self._in_flight += len(jobs)
+            try:
+                if len(jobs) == 1:
+                    await self._run_single(jobs[0])
+                else:
+                    await self._run_batch(jobs)
+            finally:
+                self._in_flight -= len(jobs)
+
+    async def _run_single(self, job):
+        try:
+            result = await asyncio.to_thread(job.context.run, self._traced_get_clue, job)
+            self._completed += 1
+            job.future.set_result(result)
+        except Exception as e:
+            self._failed += 1
+            job.future.set_exception(e)
+
+    def _traced_get_clue(self, job):
+        with span("clue_scheduler.get_clue", priority=PRIORITY_NAMES[job.priority],
+                  queue_wait_ms=round((time.monotonic() - job.enqueued_at) * 1000, 1)):
+            return job.game.get_clue()
+
+    def _traced_run_batch(self, jobs, linked_trace_ids):
+        # Le lot est tracé dans le contexte de la première demande
+        with span("clue_scheduler.run_batch", batch_size=len(jobs), linked_trace_ids=linked_trace_ids):
+            return self.batcher.run_batch([job.game for job in jobs])
+
+    async def _run_batch(self, jobs):
+        """Un seul appel à l'IA pour tout le lot ; les réponses invalides repassent en requête individuelle."""
+        by_game = {id(job.game): job for job in jobs}
+        # Lus ici, sur la boucle : aucun des contextes n'est encore actif
+        linked_trace_ids = ",".join(sorted({job.context.run(current_trace_id) or "-" for job in jobs}))
+        try:
+            failed_games = await asyncio.to_thread(jobs[0].context.run, self._traced_run_batch, jobs, linked_trace_ids)
+        except Exception as e:
+            print(f"Erreur du lot d'indices : {e}")
+            failed_games = [job.game for job in jobs]
+        self._batches += 1
+
+        failed_ids = {id(game) for game in failed_games}
+        for job in jobs:
+            if id(job.game) not in failed_ids:
+                self._completed += 1
+                job.future.set_result((job.game.keyword, job.game.number_gess_given))
+        for game in failed_games:
+            self._batch_fallbacks += 1
+            await self.bucket.acquire()
+            await self._run_single(by_game[id(game)])
+
+    def metrics(self):
+        """Retourne les métriques courantes (profondeur de file par priorité, compteurs)."""
+        return {
+            "queue_depth": {PRIORITY_NAMES[p]: n for p, n in self._queued.items()},
+            "queue_depth_total": sum(self._queued.values()),
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "shed": self._shed,
+            "failed": self._failed,
+            "batches": self._batches,
+            "batch_fallbacks": self._batch_fallbacks,
+            "max_concurrency": self.max_concurrency,
+            "available_tokens": round(self.bucket.tokens, 2),
+        }
@@ -0,0 +1,29 @@
+from game_logic import normalize_word
+
+# Jeux de mots standard (25 mots, plateau 5x5)
+STANDARD_DECKS = {
+    # Mots par défaut de l'écran de création du front
+    "default-en": [
+        "Hollywood", "Screen", "Play", "Marble", "Dinosaur",
+        "Cat", "Telescope", "Nurse", "Mail", "Fly",
+        "Atlantis", "Trick", "Watch", "Space", "Flute",
+        "Carrot", "Robin", "Shakespeare", "Collar", "Web",
+        "Desk", "Unicorn", "Match", "Sub", "Time",
+    ],
+    "default-fr": [
+        "LUNE", "CHEVAL", "PIRATE", "MIROIR", "CHOCOLAT",
+        "ROBOT", "PLAGE", "VAMPIRE", "TOUR", "FEU",
+        "AVION", "BANANE", "NEIGE", "BANQUIER", "DRAGON",
+        "SOURIS", "BIBLIOTHÈQUE", "COEUR", "NUAGE", "TRAIN",
+        "FUSÉE", "TÉLÉPHONE", "MAGIE", "SOLDAT", "FORÊT",
+    ],
+}
+
+_DECKS_BY_WORDS = {
+    frozenset(normalize_word(w) for w in words): name for name, words in STANDARD_DECKS.items()
+}
+
+
+def deck_for_cards(cards):
+    """Retourne le nom du jeu standard composé exactement de ces mots (dans n'importe quel ordre), sinon None."""
+    return _DECKS_BY_WORDS.get(frozenset(normalize_word(w) for w in cards))
@@ -0,0 +1,111 @@
+import os
+import zlib
+
+import numpy as np
+
+from game_logic import normalize_word
+
+
+def hashed_ngram_vector(word, dim):
+    """
+    Vecteur de repli pour un mot absent du vocabulaire : somme signée de
+    n-grammes de caractères hachés (calcul local et déterministe).
+    Deux mots qui partagent des fragments (pluriels, dérivés) restent proches.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f"<{normalize_word(word)}>"
+    for n in (3, 4):
+        for i in range(len(padded) - n + 1):
+            h = zlib.crc32(padded[i:i + n].encode('utf-8'))
+            vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class WordEmbeddings:
+    """
+    Ensemble local de vecteurs de mots, normalisés L2.
+    Les mots sont indexés sous leur forme normalisée (normalize_word) pour que
+    FORÊT / foret / Forêt désignent la même entrée.
+    `source` décrit l'origine des vecteurs (chemin, ou 'n-grammes' pour le repli).
+    """
+
+    def __init__(self, words, matrix, source=None, keys=None):
+        """`keys` : formes normalisées déjà calculées et uniques (index construit par build_vocab.py)."""
+        self.words = list(words)
+        self.source = source
+        self.matrix = matrix
+        self.dim = matrix.shape[1]
+        if keys is not None:
+            self.index = dict(zip(keys, range(len(keys))))
+        else:
+            self.index = {}
+            for i, word in enumerate(words):
+                self.index.setdefault(normalize_word(word), i)
+
+    @classmethod
+    def from_text_file(cls, path, limit=None):
+        """Charge un fichier de vecteurs au format texte (word2vec/GloVe : 'mot v1 v2 ...')."""
+        words, rows = [], []
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                parts = line.rstrip().split(' ')
+                if len(parts) <= 2: # Ligne d'en-tête word2vec "N D"
+                    continue
+                words.append(parts[0])
+                rows.append(np.asarray(parts[1:], dtype=np.float32))
+                if limit and len(words) >= limit:
+                    break
+        matrix = np.vstack(rows)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-8)
+        print(f"{len(words)} vecteurs de mots chargés depuis '{path}'.")
+        return cls(words, matrix, source=path)
+
+    @classmethod
+    def from_index(cls, directory):
+        """
+        Charge un index construit par build_vocab.py. La matrice float16 est
+        mappée en mémoire (lecture seule) : chargement quasi instantané et
+        pages partagées entre les processus.
+        """
+        matrix = np.load(os.path.join(directory, "vectors.f16.npy"), mmap_mode='r')
+        with open(os.path.join(directory, "vocab.txt"), 'r', encoding='utf-8') as f:
+            words = f.read().splitlines()
+        keys = None
+        keys_path = os.path.join(directory, "keys.txt")
+        if os.path.exists(keys_path): # Absent des index construits avant le format 2
+            with open(keys_path, 'r', encoding='utf-8') as f:
+                keys = f.read().splitlines()
+        print(f"Index de {len(words)} vecteurs de mots mappé depuis '{directory}'.")
+        return cls(words, matrix, source=directory, keys=keys)
+
+    @classmethod
+    def hashed_only(cls, dim=256):
+        """Embeddings sans vocabulaire : tous les mots utilisent le vecteur de repli."""
+        return cls([], np.zeros((0, dim), dtype=np.float32), source="n-grammes")
+
+    @classmethod
+    def load_default(cls):
+        """
+        Charge l'index indiqué par WORD_VECTORS_INDEX (voir build_vocab.py), sinon
+        le fichier texte WORD_VECTORS_PATH, sinon le repli par n-grammes.
+        """
+        index_dir = os.getenv("WORD_VECTORS_INDEX")
+        if index_dir and os.path.isdir(index_dir):
+            return cls.from_index(index_dir)
+        path = os.getenv("WORD_VECTORS_PATH")
+        if path and os.path.exists(path):
+            return cls.from_text_file(path, limit=int(os.getenv("WORD_VECTORS_LIMIT", "200000")))
+        print("Aucun fichier de vecteurs de mots : utilisation des vecteurs n-grammes.")
+        return cls.hashed_only()
+
+    def __contains__(self, word):
+        return normalize_word(word) in self.index
+
+    def encode(self, words):
+        """Retourne la matrice (len(words), dim) des vecteurs des mots donnés."""
+        out = np.empty((len(words), self.dim), dtype=np.float32)
+        for i, word in enumerate(words):
+            row = self.index.get(normalize_word(word))
+            out[i] = self.matrix[row] if row is not None else hashed_ngram_vector(word, self.dim)
+        return out
@@ -1,14 +1,54 @@
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 import uvicorn
+import asyncio
 import json
 import os
+from contextlib import asynccontextmanager
 from enum import Enum
 from game_logic import Game
+from clue_scheduler import ClueScheduler, PRIORITY_TURN, PRIORITY_NEW_GAME
+from clue_batcher import ClueBatcher
+from ai_guesser import AIGuesser
+from analytics_export import export_games
+from storage import FileGameStore
+from idempotency import IdempotencyStore, IdempotencyKeyConflict
+from decks import STANDARD_DECKS, deck_for_cards
+from game_pool import GamePool
+from word_bank import DeckGenerator, validate_deck
+from tracing import tracer, span
+
+# Central scheduler for all LLM clue requests
+clue_scheduler = ClueScheduler.from_env(batcher=ClueBatcher.from_env())
+
+# Ready-to-play games (opening clue computed) for the standard decks
+game_pool = GamePool.from_env(STANDARD_DECKS, clue_scheduler)
+
+# Server-side decks drawn from the word bank, avoiding each session's recent words
+deck_generator = DeckGenerator.from_env()
+
+# Game storage (the games directory is created by the store)
+GAMES_DIR = "games"
+game_store = FileGameStore.from_env(GAMES_DIR)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background workers; on shutdown stop them, flush pending saves, then export traces."""
+    clue_scheduler.start()
+    game_pool.start()
+    try:
+        yield
+    finally:
+        await game_pool.stop()
+        await clue_scheduler.stop()
+        await game_store.close()
+        await asyncio.to_thread(tracer.shutdown)
 
-app = FastAPI(title="Word Game API")
+app = FastAPI(title="Word Game API", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -19,9 +59,22 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# Ensure games directory exists
-GAMES_DIR = "games"
-os.makedirs(GAMES_DIR, exist_ok=True)
+# Request tracing: one root span per request, W3C traceparent in and out
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with tracer.trace(request.method, request.headers.get("traceparent"),
+                      **{"http.method": request.method, "http.target": request.url.path}) as root:
+        response = await call_next(request)
+        # Span named after the route template (GET /game/{game_id}), known once routing is done
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "<unmatched>"
+        root.name = f"{request.method} {route_path}"
+        root.set_attribute("http.route", route_path)
+        root.set_attribute("http.status_code", response.status_code)
+    response.headers["traceparent"] = root.traceparent()
+    return response
+
+EXPORTS_DIR = os.getenv("EXPORTS_DIR", "exports")
 
 # Models
 class CardColor(str, Enum):
@@ -36,7 +89,14 @@ class Card(BaseModel):
     revealed: bool = False
 
 class CreateGameRequest(BaseModel):
-    cards: List[str]
+    cards: List[str] = []
+    deck: Optional[str] = None
+    board_size: Optional[int] = Field(None, ge=3, le=20)
+    team_cards: Optional[int] = Field(None, ge=2)
+    assassin_count: Optional[int] = Field(None, ge=1)
+    # Missing cards (all of them without cards or deck) are drawn from the word bank
+    theme: Optional[str] = None
+    session_id: Optional[str] = None
 
 class CreateGameResponse(BaseModel):
     game_id: str
@@ -72,63 +132,188 @@ class GuessResponse(BaseModel):
     userMassage: str
     winner: Optional[str]
 
+class AIGuessRequest(BaseModel):
+    game_id: str
+    auto_play: bool = False
+
+class AIGuessSuggestion(BaseModel):
+    word: str
+    confidence: float
+
+class AIPlayedGuess(BaseModel):
+    word: str
+    status: str
+
+class AIGuessResponse(BaseModel):
+    clue: str
+    number: int
+    suggestions: List[AIGuessSuggestion]
+    played: List[AIPlayedGuess]
+    game_over: bool
+    userMassage: str
+    winner: Optional[str]
+
+# AI operative, loaded on first use in a worker thread (word vectors can take a while to load)
+# Without word vectors (WORD_VECTORS_INDEX / WORD_VECTORS_PATH) the guesser would only compare
+# spellings (hashed n-grams): refuse with 503 unless AI_GUESSER_ALLOW_HASHED=1 opts in.
+AI_GUESSER_ALLOW_HASHED = os.getenv("AI_GUESSER_ALLOW_HASHED", "0") == "1"
+_ai_guesser = None
+_ai_guesser_lock = asyncio.Lock()
+
+async def get_ai_guesser():
+    global _ai_guesser
+    async with _ai_guesser_lock:
+        if _ai_guesser is None:
+            _ai_guesser = await asyncio.to_thread(AIGuesser)
+    return _ai_guesser
+
 
 # File operations for game storage
-def save_game(game):
-    """Save game to a JSON file"""
-    filename_save = os.path.join(GAMES_DIR, f"{game.id_game}.json")
-    
-    with open(filename_save, 'w', encoding='utf-8') as f:
-        f.write(game.to_json_string())
+async def save_game(game):
+    """Save game to a JSON file (atomic write, off the event loop)"""
+    with span("save_game", game_id=game.id_game):
+        await game_store.save(game)
 
 
-def load_game(game_id: str):
+async def load_game(game_id: str):
     """Load game from a JSON file"""
-    file_path = os.path.join(GAMES_DIR, f"{game_id}.json")
-    print (file_path)
-    
-    if not os.path.exists(file_path):
-        return None
+    with span("load_game", game_id=game_id) as load_span:
+        game = await game_store.load(game_id)
+        if load_span is not None:
+            load_span.set_attribute("found", game is not None)
+    if game is not None:
+        print(f"Partie chargée depuis '{game_store.path_for(game_id)}'.")
+    return game
+
+def serialize_response(response):
+    """Encode a response model to JSON inside its own span."""
+    with span("serialize_response", model=type(response).__name__):
+        return JSONResponse(content=jsonable_encoder(response))
+
+# Completed responses of POST requests, replayed for retried Idempotency-Key
+idempotency_store = IdempotencyStore.from_env()
+
+async def run_idempotent(scope, idempotency_key, request, handler):
+    """Run handler once per Idempotency-Key; duplicates get the stored response."""
+    if not idempotency_key:
+        return await handler()
+    fingerprint = json.dumps(jsonable_encoder(request), sort_keys=True)
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            json_data = f.read()
-
-        print (json_data)
-        game = Game.from_json_string(json_data)
-        print(f"Partie chargée depuis '{file_path}'.")
-        return game
-    except FileNotFoundError:
-        print(f"Erreur : Fichier '{file_path}' non trouvé.")
-    except json.JSONDecodeError:
-        print(f"Erreur : Le fichier '{file_path}' ne contient pas de JSON valide.")
-    # except Exception as e:
-    #     print(f"Erreur inattendue lors du chargement de la partie : {e}")
-        # Optionnellement, demander à nouveau ou commencer une nouvelle partie
+        return await idempotency_store.run(scope, idempotency_key, fingerprint, handler)
+    except IdempotencyKeyConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key already used with a different request")
+
+# Turn logic shared by human and AI guesses
+async def apply_guess(game, guess_word_input, response):
+    """Play one guess (or 'PASSE') on the game and update the turn. Returns the guess status."""
+    max_guesses_this_round = game.number_gess_given + 1 if game.number_gess_given > 0 else 1
+    attempt_num = game.guesses_correct_this_round + 1
+
+    
+    # Si toutes les cibles de l'indice ont été trouvées et qu'il reste des tentatives (le +1)
+    if game.number_gess_given > 0 and game.guesses_correct_this_round == game.number_gess_given and attempt_num > game.number_gess_given:
+            print("Vous avez trouvé tous les mots de l'indice. Ceci est une devinette bonus.")
+    elif game.number_gess_given == 0 and attempt_num ==1:
+            print("Indice '0'. Vous pouvez tenter une devinette ou passer.")
+    
+
+    if guess_word_input == 'PASSE':
+        print("L'équipe passe son tour.")
+        game.end_round(fetch_clue=False)
+        await clue_scheduler.request_clue(game, PRIORITY_TURN)
+        response.userMassage += "L'équipe passe son tour.\n"
+        return 'PASS'
+        
+    else : 
+        guess_status, messageUser = game.process_guess(guess_word_input)
+        response.userMassage += messageUser + "\n"
+
+        if guess_status == 'INVALID_WORD':
+            print(f"Le mot '{guess_word_input}' n'est pas sur le plateau. Réessayez cette tentative.")
+            raise HTTPException(status_code=500, detail="Invalid word")
+        elif guess_status == 'ALREADY_REVEALED':
+            print(f"Le mot '{guess_word_input}' a déjà été révélé.")
+            raise HTTPException(status_code=500, detail="Already revealed")
+        
+        elif guess_status == 'NEUTRAL' or guess_status == 'OPPONENT' or guess_status == 'ASSASSIN_LOSS':
+            response.userMassage += "Fin du tour pour cette équipe.\n"
+            print("Fin du tour pour cette équipe.")
+            game.end_round(fetch_clue=False)
+            if not game.game_over:
+                await clue_scheduler.request_clue(game, PRIORITY_TURN)
+
+        elif guess_status == 'CORRECT_CONTINUE':
+            game.guesses_correct_this_round += 1
+            if game.number_gess_given > 0 and game.guesses_correct_this_round == game.number_gess_given:
+                response.userMassage += f"Vous avez trouvé les {game.number_gess_given} mots cibles de l'indice !\n"
+                print(f"Vous avez trouvé les {game.number_gess_given} mots cibles de l'indice !")
+
+                if attempt_num < max_guesses_this_round:
+                    response.userMassage += "Vous avez encore une devinette bonus si vous le souhaitez.\n"
+                    print("Vous avez encore une devinette bonus si vous le souhaitez.")
+                # Si attempt_num == max_guesses_this_round, la boucle se terminera naturellement.
+            elif game.number_gess_given == 0 and guess_status == 'CORRECT_CONTINUE': # Trouvé un mot correct sur un indice 0
+                response.userMassage += "Fin du tour pour cette équipe (indice 0 et mot correct trouvé).\n"
+                print("Fin du tour pour cette équipe (indice 0 et mot correct trouvé).")
+                game.end_round(fetch_clue=False)
+                await clue_scheduler.request_clue(game, PRIORITY_TURN)
+        return guess_status
 
 # Routes
 @app.post("/game", response_model=CreateGameResponse)
-async def create_game(request: CreateGameRequest):
+async def create_game(request: CreateGameRequest, idempotency_key: Optional[str] = Header(None)):
     """Create a new game with the given cards and ID."""
+    return await run_idempotent("POST /game", idempotency_key, request, lambda: _create_game(request))
+
+async def _create_game(request: CreateGameRequest):
     print (request.cards)
-    game = Game(request.cards)
+    board_size = request.board_size or Game.BOARD_SIZE
+    try:
+        cards = validate_deck(request.cards, board_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    deck_name = request.deck or deck_for_cards(cards)
+    if request.deck and request.deck not in STANDARD_DECKS:
+        raise HTTPException(status_code=400, detail=f"Unknown deck: {request.deck}")
+    if deck_name and not (request.board_size or request.team_cards or request.assassin_count):
+        game = game_pool.claim(deck_name)
+        if game is not None:
+            print(f"Partie prête prise dans la réserve ({deck_name}).")
+            await save_game(game)
+            return serialize_response(CreateGameResponse(game_id=game.id_game, first_player=game.current_player))
+
+    try:
+        if deck_name and not cards:
+            words = STANDARD_DECKS[deck_name]
+        else:
+            # Client cards, completed from the word bank when short (or a fully generated deck)
+            words = deck_generator.generate(board_size * board_size, request.theme, request.session_id, cards)
+        game = Game(
+            words,
+            board_size=request.board_size,
+            team_cards=request.team_cards,
+            assassin_count=request.assassin_count,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     # Check if game already exists
-    if os.path.exists(os.path.join(GAMES_DIR, f"{game.id_game}.json")):
+    if await game_store.exists(game.id_game):
         raise HTTPException(status_code=400, detail="Game ID already exists")
 
     game.turn_display_counter = 1 
-    game.get_clue()
+    await clue_scheduler.request_clue(game, PRIORITY_NEW_GAME)
     game.guesses_correct_this_round = 0
 
     # Save game to file
-    save_game(game)
+    await save_game(game)
     
-    return CreateGameResponse(game_id=game.id_game, first_player=game.current_player)
+    return serialize_response(CreateGameResponse(game_id=game.id_game, first_player=game.current_player))
 
 @app.get("/game/{game_id}", response_model=GameStateResponse)
 async def get_game_state(game_id: str):
     """Get the current state of the game."""
     print (game_id)
-    game = load_game(game_id)
+    game = await load_game(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
@@ -142,7 +327,7 @@ async def get_game_state(game_id: str):
     print(f"\nDevinette {attempt_num}/{max_guesses_this_round} pour l'indice '{keyword}, {game.number_gess_given}'.")
     print (game.current_player)
     
-    return GameStateResponse(
+    return serialize_response(GameStateResponse(
         current_clue=game.keyword,
         current_clue_number=game.number_gess_given,
         red_score=game.red_score,
@@ -153,12 +338,15 @@ async def get_game_state(game_id: str):
         color_matrix=game.color_matrix,
         word_matrix=game.word_matrix,
         revealed_matrix=game.revealed_matrix
-    )
+    ))
 
 @app.post("/guess", response_model=GuessResponse)
-async def make_guess(request: GuessRequest):
+async def make_guess(request: GuessRequest, idempotency_key: Optional[str] = Header(None)):
     """Submit a guess for a word."""
-    game = load_game(request.game_id)
+    return await run_idempotent("POST /guess", idempotency_key, request, lambda: _make_guess(request))
+
+async def _make_guess(request: GuessRequest):
+    game = await load_game(request.game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
     
@@ -169,56 +357,11 @@ async def make_guess(request: GuessRequest):
         winner="",
     )
 
-    max_guesses_this_round = game.number_gess_given + 1 if game.number_gess_given > 0 else 1
-    attempt_num = game.guesses_correct_this_round + 1
-
-    
-    # Si toutes les cibles de l'indice ont été trouvées et qu'il reste des tentatives (le +1)
-    if game.number_gess_given > 0 and game.guesses_correct_this_round == game.number_gess_given and attempt_num > game.number_gess_given:
-            print("Vous avez trouvé tous les mots de l'indice. Ceci est une devinette bonus.")
-    elif game.number_gess_given == 0 and attempt_num ==1:
-            print("Indice '0'. Vous pouvez tenter une devinette ou passer.")
-    
-
     guess_word_input = request.guess_word.strip().upper()
+    await apply_guess(game, guess_word_input, response)
 
-    if guess_word_input == 'PASSE':
-        print("L'équipe passe son tour.")
-        game.end_round()
-        response.userMassage += "L'équipe passe son tour.\n"
-        
-    else : 
-        guess_status, messageUser = game.process_guess(guess_word_input)
-        response.userMassage += messageUser + "\n"
-
-        if guess_status == 'INVALID_WORD':
-            print(f"Le mot '{guess_word_input}' n'est pas sur le plateau. Réessayez cette tentative.")
-            raise HTTPException(status_code=500, detail="Invalid word")
-        elif guess_status == 'ALREADY_REVEALED':
-            print(f"Le mot '{guess_word_input}' a déjà été révélé.")
-            raise HTTPException(status_code=500, detail="Already revealed")
-        
-        elif guess_status == 'NEUTRAL' or guess_status == 'OPPONENT' or guess_status == 'ASSASSIN_LOSS':
-            response.userMassage += "Fin du tour pour cette équipe.\n"
-            print("Fin du tour pour cette équipe.")
-            game.end_round()
-
-        elif guess_status == 'CORRECT_CONTINUE':
-            game.guesses_correct_this_round += 1
-            if game.number_gess_given > 0 and game.guesses_correct_this_round == game.number_gess_given:
-                response.userMassage += f"Vous avez trouvé les {game.number_gess_given} mots cibles de l'indice !\n"
-                print(f"Vous avez trouvé les {game.number_gess_given} mots cibles de l'indice !")
-
-                if attempt_num < max_guesses_this_round:
-                    response.userMassage += "Vous avez encore une devinette bonus si vous le souhaitez.\n"
-                    print("Vous avez encore une devinette bonus si vous le souhaitez.")
-                # Si attempt_num == max_guesses_this_round, la boucle se terminera naturellement.
-            elif game.number_gess_given == 0 and guess_status == 'CORRECT_CONTINUE': # Trouvé un mot correct sur un indice 0
-                response.userMassage += "Fin du tour pour cette équipe (indice 0 et mot correct trouvé).\n"
-                print("Fin du tour pour cette équipe (indice 0 et mot correct trouvé).")
-                game.end_round()
     # Save updated game
-    save_game(game)
+    await save_game(game)
 
     if game.game_over: # L'adversaire a pu gagner
         print(f"L'équipe {game.winner.upper()} a gagné !")
@@ -228,7 +371,69 @@ async def make_guess(request: GuessRequest):
 
     game.display_board(show_colors=True)
     
-    return response
+    return serialize_response(response)
+
+@app.post("/ai-guess", response_model=AIGuessResponse)
+async def make_ai_guess(request: AIGuessRequest):
+    """Rank guesses for the current clue with the AI operative; with auto_play, play the whole turn."""
+    game = await load_game(request.game_id)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if game.game_over:
+        raise HTTPException(status_code=400, detail="Game is over")
+    if not game.keyword:
+        raise HTTPException(status_code=409, detail="No current clue to guess from")
+
+    guesser = await get_ai_guesser()
+    if not guesser.embeddings.words and not AI_GUESSER_ALLOW_HASHED:
+        raise HTTPException(
+            status_code=503,
+            detail="AI operative unavailable: no word vectors configured (set WORD_VECTORS_INDEX or WORD_VECTORS_PATH)",
+        )
+    clue, number = game.keyword, game.number_gess_given
+    suggestions = guesser.suggest(game)
+    response = AIGuessResponse(
+        clue=clue,
+        number=number,
+        suggestions=[AIGuessSuggestion(word=w, confidence=conf) for w, conf, _ in suggestions],
+        played=[],
+        game_over=False,
+        userMassage="",
+        winner=None,
+    )
+
+    if request.auto_play:
+        # Joue les mots dans l'ordre tant que l'équipe garde la main, sans devinette bonus
+        player = game.current_player
+        while not game.game_over and game.current_player == player:
+            if game.guesses_correct_this_round >= max(number, 1):
+                response.played.append(AIPlayedGuess(word='PASSE', status=await apply_guess(game, 'PASSE', response)))
+                break
+            word = guesser.suggest(game, top_k=1)[0][0]
+            response.played.append(AIPlayedGuess(word=word, status=await apply_guess(game, word.upper(), response)))
+        await save_game(game)
+
+    if game.game_over:
+        response.userMassage += f"L'équipe {game.winner.upper()} a gagné !\n"
+        response.game_over = True
+        response.winner = game.winner.upper()
+
+    return serialize_response(response)
+
+@app.post("/export")
+async def export_analytics(full: bool = False):
+    """Export games, board cells and moves changed since the last run to columnar files."""
+    return await asyncio.to_thread(export_games, GAMES_DIR, EXPORTS_DIR, full=full)
+
+@app.get("/metrics/clues")
+async def get_clue_metrics():
+    """Queue depth and counters of the clue scheduler."""
+    return clue_scheduler.metrics()
+
+@app.get("/metrics/pool")
+async def get_pool_metrics():
+    """Ready games per deck and claim counters of the warm game pool."""
+    return game_pool.metrics()
 
 if __name__ == "__main__":
     uvicorn.run("game_api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,5 +1,7 @@
 import random
 import json
+import re
+import unicodedata
 import uuid # Ajout de l'import pour la sérialisation JSON
 
 from dotenv import load_dotenv
@@ -10,6 +12,49 @@ import os
 # import openai
 from openai import OpenAI # Utilisation recommandée pour les versions récentes
 
+from tracing import span, traced
+
+# Un candidat d'indice : "MOT, 2", "1. MOT : 2", "- MOT (2)"...
+CLUE_CANDIDATE_RE = re.compile(
+    r"^\s*(?:[-*•]|\d+\s*[.)])?\s*(?P<word>[^\W\d_]+(?:['’-][^\W\d_]+)*)\s*[,:;(–-]?\s*(?P<number>\d+)\s*\)?\s*\.?\s*$"
+)
+# Mise en forme markdown et guillemets autour des réponses (**MOT**, 2 ; "MOT", 2 ; `MOT`, 2)
+CLUE_DECORATION_RE = re.compile(r"[*`\"“”«»]|(?<![^\W\d_])['’]|['’](?![^\W\d_])")
+
+def normalize_word(word):
+    """Normalise un mot pour les comparaisons : majuscules, sans accents ni espaces superflus."""
+    decomposed = unicodedata.normalize('NFKD', word.strip().upper())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def parse_clue_candidates(text):
+    """
+    Extrait les candidats (MOT, nombre) d'une réponse de l'IA.
+    Les candidats sont séparés par des retours à la ligne ou des points-virgules ;
+    le gras, le code et les guillemets sont retirés (l'apostrophe d'AUJOURD'HUI est gardée) ;
+    les éléments mal formés (plusieurs mots, nombre absent ou non entier) sont ignorés.
+    """
+    candidates = []
+    for chunk in re.split(r"[\n;]", text):
+        match = CLUE_CANDIDATE_RE.match(CLUE_DECORATION_RE.sub("", chunk))
+        if match:
+            candidates.append((match.group('word').upper(), int(match.group('number'))))
+    return candidates
+
+def request_completion(prompt, max_tokens, temperature=0.5):
+    """Envoie un prompt au modèle et retourne le texte de la réponse."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("Clé API OpenAI non trouvée dans les variables d'environnement.")
+    client = OpenAI(api_key=api_key)
+    with span("llm.chat.completions", model="gpt-4o", max_tokens=max_tokens, prompt_chars=len(prompt)):
+        response = client.chat.completions.create(
+            model="gpt-4o", # Ou un autre modèle approprié
+            messages=[{"role": "system", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+    return response.choices[0].message.content.strip()
+
 class Game:
     """
     Représente une partie du jeu de type Codenames.
@@ -17,28 +62,64 @@ class Game:
     Permet la sauvegarde et le chargement de l'état du jeu via JSON.
     """
     BOARD_SIZE = 5
-
-    def __init__(self, game_words=None, load_data=None):
+    # Mots utilisés comme indice dégradé (nombre 0) quand l'IA n'est pas sollicitée
+    FALLBACK_CLUE_WORDS = ("LIBRE", "JOKER", "HASARD")
+    # Nombre d'indices candidats demandés à l'IA en un seul appel
+    CLUE_CANDIDATES = 3
+    # Champs qui ne changent pas pendant la partie, en tête du JSON sauvegardé
+    STATIC_JSON_KEYS = ('id_game', 'board_size', 'assassin_count', 'color_matrix', 'word_matrix')
+
+    def __init__(self, game_words=None, load_data=None, board_size=None, team_cards=None, assassin_count=None):
         """
         Initialise une nouvelle partie ou charge une partie depuis des données.
         Args:
             load_data (dict, optional): Dictionnaire contenant l'état du jeu à charger.
                                         Si None, une nouvelle partie est initialisée.
+            board_size (int, optional): Côté du plateau (BOARD_SIZE par défaut).
+            team_cards (int, optional): Cartes de l'équipe qui commence (l'autre en a une de moins).
+            assassin_count (int, optional): Nombre d'assassins.
+                                            Par défaut, distribution proportionnelle au plateau 5x5 (9/8/1).
         """
         if load_data:
             self._load_state_from_data(load_data)
         else:
-            self._initialize_new_game_state(game_words)
+            self._initialize_new_game_state(game_words, board_size or self.BOARD_SIZE, team_cards, assassin_count)
+        self._build_indexes()
+
+    @staticmethod
+    def default_color_distribution(board_size):
+        """Retourne (cartes de l'équipe qui commence, assassins) proportionnellement au plateau 5x5."""
+        cells = board_size * board_size
+        return round(cells * 9 / 25), max(1, round(cells / 25))
 
-    def _initialize_new_game_state(self, game_words):
+    def _initialize_new_game_state(self, game_words, board_size, team_cards, assassin_count):
         """Initialise l'état pour une nouvelle partie."""
         print("Initialisation d'une nouvelle partie...")
         self.id_game = str(uuid.uuid4()) 
+        self.board_size = board_size
+
+        default_team_cards, default_assassins = self.default_color_distribution(board_size)
+        team_cards = team_cards or default_team_cards
+        self.assassin_count = assassin_count or default_assassins
+        if team_cards < 2:
+            raise ValueError(
+                f"Il faut au moins 2 cartes pour l'équipe qui commence ({team_cards} sur un plateau "
+                f"{board_size}x{board_size}) : l'autre équipe en a une de moins."
+            )
+        if team_cards * 2 - 1 + self.assassin_count > board_size * board_size:
+            raise ValueError(
+                f"Distribution de couleurs impossible sur un plateau {board_size}x{board_size} : "
+                f"{team_cards}/{team_cards - 1} cartes d'équipe et {self.assassin_count} assassin(s)."
+            )
+        if game_words is None or len(game_words) < board_size * board_size:
+            raise ValueError(f"Il faut {board_size * board_size} mots pour un plateau {board_size}x{board_size}.")
         
         # Initialisation des matrices vides
-        self.color_matrix = [[None for _ in range(self.BOARD_SIZE)] for _ in range(self.BOARD_SIZE)]
-        self.word_matrix = [[None for _ in range(self.BOARD_SIZE)] for _ in range(self.BOARD_SIZE)]
-        self.revealed_matrix = [[False for _ in range(self.BOARD_SIZE)] for _ in range(self.BOARD_SIZE)]
+        self.color_matrix = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.word_matrix = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.revealed_matrix = [[False for _ in range(self.board_size)] for _ in range(self.board_size)]
+        # Cases révélées dans l'ordre des coups (sérialisation en O(cases révélées))
+        self.revealed_cells = []
 
         # Scores des équipes
         self.red_score = 0
@@ -48,18 +129,20 @@ class Game:
         self.number_gess_given = 0
         self.guesses_correct_this_round = 0
         self.turn_display_counter = 0
+        # Historique des coups (indices, devinettes, fins de tour) pour l'analyse
+        self.history = []
 
 
         # Détermination du joueur qui commence et du nombre total de cartes par couleur
         if random.choice([True, False]):
             self.current_player = 'red'
-            self.red_cards_total = 9
-            self.blue_cards_total = 8
+            self.red_cards_total = team_cards
+            self.blue_cards_total = team_cards - 1
             print("L'équipe ROUGE commence.")
         else:
             self.current_player = 'blue'
-            self.red_cards_total = 8
-            self.blue_cards_total = 9
+            self.red_cards_total = team_cards - 1
+            self.blue_cards_total = team_cards
             print("L'équipe BLEUE commence.")
 
         # Initialisation des matrices de mots et couleurs (avec placeholders pour votre code)
@@ -75,18 +158,27 @@ class Game:
     def _load_state_from_data(self, data):
         """Charge l'état du jeu à partir d'un dictionnaire de données."""
         print("Chargement de l'état du jeu depuis les données...")
-        # Vérification optionnelle de la taille du plateau
-        loaded_board_size = data.get('board_size', self.BOARD_SIZE)
-        if loaded_board_size != self.BOARD_SIZE:
+        # Vérification de la taille du plateau
+        self.board_size = data.get('board_size', self.BOARD_SIZE)
+        if len(data['word_matrix']) != self.board_size:
             raise ValueError(
-                f"Taille de plateau incompatible ({loaded_board_size}) dans les données sauvegardées. "
-                f"Attendu : {self.BOARD_SIZE}"
+                f"Taille de plateau incohérente dans les données sauvegardées : "
+                f"{len(data['word_matrix'])} lignes pour board_size={self.board_size}."
             )
 
         self.id_game = data['id_game']
         self.color_matrix = data['color_matrix']
         self.word_matrix = data['word_matrix']
-        self.revealed_matrix = data['revealed_matrix']
+        self.assassin_count = data.get('assassin_count', 1)
+        if 'revealed_cells' in data:
+            self.revealed_cells = data['revealed_cells']
+            self.revealed_matrix = [[False] * self.board_size for _ in range(self.board_size)]
+            for r, c in self.revealed_cells:
+                self.revealed_matrix[r][c] = True
+        else: # Anciennes sauvegardes : matrice complète
+            self.revealed_matrix = data['revealed_matrix']
+            self.revealed_cells = [[r, c] for r in range(self.board_size) for c in range(self.board_size)
+                                   if self.revealed_matrix[r][c]]
         self.red_score = data['red_score']
         self.blue_score = data['blue_score']
         self.current_player = data['current_player']
@@ -98,24 +190,58 @@ class Game:
         self.number_gess_given = data['number_gess_given']
         self.guesses_correct_this_round = data['guesses_correct_this_round']
         self.turn_display_counter = data['turn_display_counter']
+        self.history = data.get('history', []) # Absent des anciennes sauvegardes
 
         # self.turn_count = data.get('turn_count', 1) # Charger le numéro du tour
         print("État du jeu chargé.")
 
     @classmethod
+    @traced("Game.from_json_string")
     def from_json_string(cls, json_str):
-        """Crée une instance de Game à partir d'une chaîne JSON."""
+        """
+        Crée une instance de Game à partir d'une chaîne JSON.
+        Si la chaîne a été écrite par to_json_string (partie statique en tête),
+        ce fragment est repris tel quel : la sauvegarde qui suit la requête ne
+        réencode pas les matrices de mots et de couleurs.
+        """
         data = json.loads(json_str)
-        return cls(load_data=data)
+        game = cls(load_data=data)
+        if list(data)[:len(cls.STATIC_JSON_KEYS) + 1] == [*cls.STATIC_JSON_KEYS, 'revealed_cells']:
+            # Une clé ne peut pas apparaître non échappée dans une valeur : la première occurrence est la bonne
+            game._static_json = json_str[json_str.index('{') + 1:json_str.index('"revealed_cells"')].rstrip().rstrip(',')
+        return game
+
+    def _build_indexes(self):
+        """
+        Construit les index utilisés pendant la partie (un seul parcours du plateau) :
+        - mot (majuscules) -> coordonnées, pour _find_word_coords en O(1)
+        - cases non révélées, au total et par couleur, dans l'ordre du plateau,
+          pour que les requêtes de mots restants soient en O(mots restants).
+        La partie statique du JSON (mots, couleurs) est mise en cache à la sérialisation.
+        """
+        self._word_index = {}
+        self._unrevealed = {}
+        self._unrevealed_by_color = {}
+        self._static_json = None
+        for r in range(self.board_size):
+            for c in range(self.board_size):
+                self._word_index.setdefault(self.word_matrix[r][c].upper(), (r, c))
+                if not self.revealed_matrix[r][c]:
+                    self._unrevealed[(r, c)] = None
+                    self._unrevealed_by_color.setdefault(self.color_matrix[r][c], {})[(r, c)] = None
 
     def to_json_string(self):
-        """Sérialise l'état actuel du jeu en une chaîne JSON."""
+        """
+        Sérialise l'état actuel du jeu en une chaîne JSON.
+        Les matrices de mots et de couleurs ne changent pas pendant la partie : leur
+        encodage est calculé une seule fois par instance (ou repris de la chaîne
+        chargée, voir from_json_string), et les cases révélées sont sérialisées
+        sous forme de liste de coordonnées.
+        """
+        if self._static_json is None:
+            self._static_json = json.dumps({key: getattr(self, key) for key in self.STATIC_JSON_KEYS})[1:-1]
         state = {
-            'id_game': self.id_game,
-            'board_size': self.BOARD_SIZE,
-            'color_matrix': self.color_matrix,
-            'word_matrix': self.word_matrix,
-            'revealed_matrix': self.revealed_matrix,
+            'revealed_cells': self.revealed_cells,
             'red_score': self.red_score,
             'blue_score': self.blue_score,
             'current_player': self.current_player,
@@ -126,11 +252,12 @@ class Game:
             'keyword': self.keyword,
             'number_gess_given': self.number_gess_given,
             'guesses_correct_this_round': self.guesses_correct_this_round,
-            'turn_display_counter': self.turn_display_counter
+            'turn_display_counter': self.turn_display_counter,
+            'history': self.history
 
             # 'turn_count': self.turn_count, # Si vous suivez le numéro du tour dans self
         }
-        return json.dumps(state, indent=2) # indent=2 pour une sortie JSON lisible
+        return '{' + self._static_json + ', ' + json.dumps(state)[1:]
 
     def _initialize_color_matrix(self):
         """
@@ -140,14 +267,14 @@ class Game:
         print("Initialisation de la matrice des couleurs (placeholder)...")
         colors = ['red'] * self.red_cards_total + \
                  ['blue'] * self.blue_cards_total + \
-                 ['assassin'] * 1
-        neutral_count = self.BOARD_SIZE * self.BOARD_SIZE - len(colors)
+                 ['assassin'] * self.assassin_count
+        neutral_count = self.board_size * self.board_size - len(colors)
         colors += ['neutral'] * neutral_count
         random.shuffle(colors)
 
         k = 0
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
+        for r in range(self.board_size):
+            for c in range(self.board_size):
                 self.color_matrix[r][c] = colors[k]
                 k += 1
         print("Matrice des couleurs initialisée.")
@@ -167,88 +294,116 @@ class Game:
         # ]
         # random.shuffle(words)
         k = 0
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
+        for r in range(self.board_size):
+            for c in range(self.board_size):
                 self.word_matrix[r][c] = game_words[k]
                 k += 1
         print("Matrice des mots initialisée.")
 
     def _get_remaining_words(self, color):
         """Retourne la liste des mots non découverts pour une couleur donnée."""
-        remaining = []
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
-                if self.color_matrix[r][c] == color and not self.revealed_matrix[r][c]:
-                    remaining.append(self.word_matrix[r][c])
-        return remaining
+        return [self.word_matrix[r][c] for r, c in self._unrevealed_by_color.get(color, ())]
 
     def _get_all_unrevealed_words(self):
         """Retourne la liste de tous les mots non découverts sur le plateau."""
-        unrevealed = []
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
-                if not self.revealed_matrix[r][c]:
-                    unrevealed.append(self.word_matrix[r][c])
-        return unrevealed
+        return [self.word_matrix[r][c] for r, c in self._unrevealed]
 
+    def build_clue_prompt(self):
+        """Construit le prompt demandant plusieurs indices candidats pour le joueur actuel."""
+        target_words = self._get_remaining_words(self.current_player)
+        all_unrevealed_words = self._get_all_unrevealed_words()
+        return (
+            f"Vous êtes l'espion de l'équipe {self.current_player} dans une partie de Codenames.\n"
+            f"Voici les mots que votre équipe doit deviner : {', '.join(target_words)}\n"
+            f"Voici tous les mots actuellement sur le plateau : {', '.join(all_unrevealed_words)}\n"
+            f"Proposez {self.CLUE_CANDIDATES} indices différents, un par ligne, du meilleur au moins bon, "
+            f"chacun sous la forme 'MOT, CHIFFRE' où MOT est un seul mot qui n'est PAS sur le plateau "
+            f"et CHIFFRE est le nombre de mots de votre équipe ({self.current_player}) qui sont liés à MOT. "
+            f"Ne donnez que les lignes 'MOT, CHIFFRE', sans aucun autre texte."
+        )
+
+    def filter_clue_candidates(self, candidates):
+        """
+        Filtre localement des indices candidats (mot-clé, nombre).
+        Sont rejetés les candidats présents sur le plateau (y compris variantes
+        d'accents/de casse) et les doublons. Le nombre est borné au nombre de mots
+        restants de l'équipe. L'ordre de l'IA (du meilleur au moins bon) est
+        conservé : le nombre annoncé par le modèle n'est pas un critère de
+        classement, il favoriserait les candidats qui surestiment leur portée.
+        """
+        board_words = {normalize_word(w) for row in self.word_matrix for w in row}
+        max_number = len(self._get_remaining_words(self.current_player))
+        seen = set()
+        valid = []
+        for keyword, number in candidates:
+            normalized = normalize_word(keyword)
+            if normalized in board_words:
+                print(f"Candidat rejeté (présent sur le plateau) : {keyword}")
+                continue
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            valid.append((keyword, min(number, max_number)))
+        return valid
+
+    def apply_clue_text(self, clue_text):
+        """
+        Analyse la réponse de l'IA (un ou plusieurs candidats 'MOT, CHIFFRE'),
+        et enregistre le meilleur candidat valide comme indice courant.
+        Retourne (mot-clé, nombre) si un indice valide a été trouvé, sinon None.
+        """
+        candidates = parse_clue_candidates(clue_text)
+        if not candidates:
+            print("Erreur : Format de réponse inattendu de l'IA.")
+            return None
+        valid = self.filter_clue_candidates(candidates)
+        if not valid:
+            print("Erreur : L'IA n'a donné que des mots présents sur le plateau.")
+            return None
+        keyword, number = valid[0]
+        print(f"Indice reçu de l'IA : {keyword}, {number} ({len(valid)}/{len(candidates)} candidats valides)")
+        self.keyword = keyword
+        self.number_gess_given = number
+        self._record_move('clue', keyword=keyword, number=number)
+        return keyword, number
+
+    @traced("Game.get_clue")
     def get_clue(self):
         """
         Obtient un indice (mot-clé et nombre) pour le joueur actuel (espion).
+        Plusieurs candidats sont demandés en un seul appel puis validés localement.
         """
-
-        target_words = self._get_remaining_words(self.current_player)
-        all_unrevealed_words = self._get_all_unrevealed_words()
-
-
         try:
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key:
-                raise ValueError("Clé API OpenAI non trouvée dans les variables d'environnement.")
-            client = OpenAI(api_key=api_key)
-            prompt = (
-                f"Vous êtes l'espion de l'équipe {self.current_player} dans une partie de Codenames.\n"
-                f"Voici les mots que votre équipe doit deviner : {', '.join(target_words)}\n"
-                f"Voici tous les mots actuellement sur le plateau : {', '.join(all_unrevealed_words)}\n"
-                f"Donnez un indice sous la forme 'MOT, CHIFFRE' où MOT est un seul mot qui n'est PAS sur le plateau "
-                f"et CHIFFRE est le nombre de mots de votre équipe ({self.current_player}) qui sont liés à MOT. "
-                f"Ne donnez que le MOT et le CHIFFRE séparés par une virgule."
-            )
-            response = client.chat.completions.create( 
-                model="gpt-4o", # Ou un autre modèle approprié
-                messages=[{"role": "system", "content": prompt}],
-                max_tokens=10,
-                temperature=0.5
-            )
-            clue_text = response.choices[0].message.content.strip()
-            parts = clue_text.split(',')
-            if len(parts) == 2:
-                keyword = parts[0].strip().upper()
-                try:
-                    number = int(parts[1].strip())
-                    if keyword not in all_unrevealed_words: # Vérification supplémentaire
-                         print(f"Indice reçu de l'IA : {keyword}, {number}")
-                         self.keyword = keyword
-                         self.number_gess_given = number
-                         return keyword, number
-                    else:
-                         print("Erreur : L'IA a donné un mot présent sur le plateau.")
-                except ValueError:
-                    print("Erreur : L'IA n'a pas retourné un chiffre valide.")
-            else:
-                 print("Erreur : Format de réponse inattendu de l'IA.")
-            return keyword, number
+            clue_text = request_completion(self.build_clue_prompt(), max_tokens=10 * self.CLUE_CANDIDATES)
+            return self.apply_clue_text(clue_text)
         except Exception as e:
             print(f"Erreur lors de l'appel à l'API OpenAI : {e}")
             print("Passage à la saisie manuelle de l'indice.")
 
+    def set_fallback_clue(self):
+        """
+        Pose un indice dégradé, calculé localement sans appel à l'IA.
+        Utilisé lorsque la demande d'indice est délestée (file d'attente saturée).
+        """
+        unrevealed_keys = {normalize_word(w) for w in self._get_all_unrevealed_words()}
+        # Si LIBRE, JOKER et HASARD sont tous sur le plateau, leur composé ne peut pas y être
+        keyword = next((w for w in self.FALLBACK_CLUE_WORDS if normalize_word(w) not in unrevealed_keys),
+                       "-".join(self.FALLBACK_CLUE_WORDS))
+        print(f"Indice dégradé utilisé : {keyword}, 0")
+        self.keyword = keyword
+        self.number_gess_given = 0
+        self._record_move('clue', keyword=keyword, number=0, fallback=True)
+        return keyword, 0
+
+    def _record_move(self, move_type, **fields):
+        """Ajoute un coup à l'historique de la partie (joueur courant inclus)."""
+        self.history.append({'type': move_type, 'player': self.current_player, **fields})
+
     def _find_word_coords(self, word_guess):
         """Trouve les coordonnées (ligne, colonne) d'un mot dans word_matrix."""
-        for r in range(self.BOARD_SIZE):
-            for c in range(self.BOARD_SIZE):
-                if self.word_matrix[r][c].upper() == word_guess.upper():
-                    return r, c
-        return None
+        return self._word_index.get(word_guess.upper())
 
+    @traced("Game.process_guess")
     def process_guess(self, guessed_word):
         """
         Traite un mot deviné par l'équipe.
@@ -275,10 +430,14 @@ class Game:
 
         # Révéler la carte
         self.revealed_matrix[r][c] = True
+        self.revealed_cells.append([r, c])
         revealed_color = self.color_matrix[r][c]
+        del self._unrevealed[(r, c)]
+        del self._unrevealed_by_color[revealed_color][(r, c)]
         original_word = self.word_matrix[r][c]
         print(f" -> '{original_word}' est de couleur : {revealed_color.upper()}")
         messageUser = f" -> '{original_word}' est de couleur : {revealed_color.upper()}"
+        self._record_move('guess', word=original_word, color=revealed_color)
 
         if revealed_color == self.current_player:
             if self.current_player == 'red':
@@ -329,22 +488,30 @@ class Game:
         """Change le joueur actuel."""
         self.current_player = 'blue' if self.current_player == 'red' else 'red'
 
-    def end_round(self):
-        """Change le joueur actuel."""
+    @traced("Game.end_round")
+    def end_round(self, fetch_clue=True):
+        """
+        Change le joueur actuel.
+        Args:
+            fetch_clue (bool): Si False, l'indice suivant n'est pas demandé ici
+                               (l'appelant le demande, par ex. via le ClueScheduler).
+        """
+        self._record_move('end_round')
         self._switch_player()
         self.keyword = ""
         self.number_gess_given = 0
         self.guesses_correct_this_round = 0
 
-        self.get_clue()
+        if fetch_clue:
+            self.get_clue()
 
     def display_board(self, show_colors=False):
         """Affiche le plateau de jeu dans la console."""
         print("\n--- PLATEAU DE JEU ---")
         col_width = 18  # Augmenté pour plus d'espace
-        for r in range(self.BOARD_SIZE):
+        for r in range(self.board_size):
             row_str = []
-            for c in range(self.BOARD_SIZE):
+            for c in range(self.board_size):
                 word = self.word_matrix[r][c]
                 if self.revealed_matrix[r][c]:
                     color = self.color_matrix[r][c]
@@ -356,7 +523,7 @@ class Game:
                     display_text = word
                 row_str.append(f"{display_text:<{col_width}}")
             print(" | ".join(row_str))
-            if r < self.BOARD_SIZE - 1:
-                 print("-" * (col_width * self.BOARD_SIZE + (self.BOARD_SIZE -1) * 3)) # Ligne séparatrice
-        print("=" * (col_width * self.BOARD_SIZE + (self.BOARD_SIZE-1) * 3)) # Ligne finale
+            if r < self.board_size - 1:
+                 print("-" * (col_width * self.board_size + (self.board_size -1) * 3)) # Ligne séparatrice
+        print("=" * (col_width * self.board_size + (self.board_size-1) * 3)) # Ligne finale
         print(f"Score : ROUGE {self.red_score}/{self.red_cards_total} - BLEU {self.blue_score}/{self.blue_cards_total}")
@@ -0,0 +1,122 @@
+import asyncio
+import os
+import random
+from collections import deque
+
+from game_logic import Game
+from clue_scheduler import TokenBucket, PRIORITY_BACKGROUND
+
+
+class GamePool:
+    """
+    Réserve de parties prêtes à jouer pour les jeux de mots standard :
+    plateau généré, couleurs tirées et premier indice déjà calculé.
+    Une création de partie sur un jeu standard prend une partie de la réserve
+    en O(1) ; une tâche de fond la recomplète, au plus `refill_rate` parties
+    par seconde, avec des demandes d'indice de priorité arrière-plan.
+    Après des échecs consécutifs (IA indisponible, délestage), le remplissage
+    s'interrompt avec un délai exponentiel (`backoff_initial` doublé à chaque
+    échec, plafonné à `backoff_max`) pour ne pas consommer les jetons du
+    planificateur dont les vraies parties ont besoin.
+    """
+
+    def __init__(self, decks, clue_scheduler, target_size=2, refill_rate=0.5, refill_burst=2,
+                 backoff_initial=2.0, backoff_max=300.0):
+        self.decks = decks
+        self.clue_scheduler = clue_scheduler
+        self.target_size = target_size
+        self.bucket = TokenBucket(refill_rate, refill_burst)
+        self._ready = {name: deque() for name in decks}
+        self._wakeup = None
+        self._task = None
+        self._claimed = 0
+        self._missed = 0
+        self._discarded = 0
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._consecutive_failures = 0
+
+    @classmethod
+    def from_env(cls, decks, clue_scheduler):
+        """Construit la réserve à partir des variables d'environnement GAME_POOL_*."""
+        return cls(
+            decks,
+            clue_scheduler,
+            target_size=int(os.getenv("GAME_POOL_SIZE", "2")),
+            refill_rate=float(os.getenv("GAME_POOL_REFILL_RATE", "0.5")),
+            refill_burst=int(os.getenv("GAME_POOL_REFILL_BURST", "2")),
+            backoff_initial=float(os.getenv("GAME_POOL_BACKOFF_INITIAL", "2")),
+            backoff_max=float(os.getenv("GAME_POOL_BACKOFF_MAX", "300")),
+        )
+
+    def start(self):
+        """Démarre le remplissage en arrière-plan (doit être appelé depuis la boucle asyncio)."""
+        if self._task is not None or self.target_size <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def claim(self, deck_name):
+        """Retire une partie prête de la réserve du jeu `deck_name`, ou None si elle est vide."""
+        ready = self._ready.get(deck_name)
+        if not ready:
+            self._missed += 1
+            return None
+        self._claimed += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return ready.popleft()
+
+    async def _build_game(self, deck_name):
+        words = list(self.decks[deck_name])
+        random.shuffle(words)
+        game = Game(words)
+        game.turn_display_counter = 1
+        await self.clue_scheduler.request_clue(game, PRIORITY_BACKGROUND)
+        game.guesses_correct_this_round = 0
+        return game
+
+    def _backoff_delay(self):
+        return min(self.backoff_max, self.backoff_initial * 2 ** (self._consecutive_failures - 1))
+
+    async def _refill_loop(self):
+        while True:
+            missing = [name for name, ready in self._ready.items() if len(ready) < self.target_size]
+            if not missing:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            for deck_name in missing:
+                await self.bucket.acquire()
+                try:
+                    game = await self._build_game(deck_name)
+                except Exception as e:
+                    print(f"Erreur lors de la préparation d'une partie ({deck_name}) : {e}")
+                    game = None
+                if game is None or not game.keyword or game.history[-1].get('fallback'):
+                    # Pas d'indice de l'IA (échec ou délestage) : la partie n'est pas mise en réserve
+                    self._discarded += 1
+                    self._consecutive_failures += 1
+                    delay = self._backoff_delay()
+                    print(f"Remplissage de la réserve suspendu {delay:.0f} s "
+                          f"({self._consecutive_failures} échec(s) consécutif(s)).")
+                    await asyncio.sleep(delay)
+                    break
+                self._consecutive_failures = 0
+                self._ready[deck_name].append(game)
+
+    def metrics(self):
+        return {
+            "ready": {name: len(ready) for name, ready in self._ready.items()},
+            "target_size": self.target_size,
+            "claimed": self._claimed,
+            "missed": self._missed,
+            "discarded": self._discarded,
+            "consecutive_failures": self._consecutive_failures,
+        }
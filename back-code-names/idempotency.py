@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+
+class IdempotencyKeyConflict(Exception):
+    """La clé d'idempotence a déjà été utilisée avec une requête différente."""
+
+
+class IdempotencyStore:
+    """
+    Mémorise les réponses des requêtes terminées par clé `Idempotency-Key`.
+    Un doublon (même portée, même clé) reçoit la réponse enregistrée sans
+    toucher à l'état de la partie ni appeler l'IA ; un doublon qui arrive
+    pendant l'exécution de l'original attend sa réponse.
+    Le stock est borné (`max_entries`, les plus anciennes sont évincées) et
+    chaque réponse expire après `ttl` secondes. Seules les réponses réussies
+    sont mémorisées : une requête en erreur peut être rejouée.
+    """
+
+    def __init__(self, max_entries=10000, ttl=24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (portée, clé) -> (expiration, empreinte, réponse), dans l'ordre d'enregistrement
+        self._completed = OrderedDict()
+        # (portée, clé) -> (empreinte, future) pour les requêtes en cours
+        self._in_flight = {}
+
+    @classmethod
+    def from_env(cls):
+        """Construit le stock à partir des variables d'environnement IDEMPOTENCY_*."""
+        return cls(
+            max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+            ttl=float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600))),
+        )
+
+    def _evict_expired(self, now):
+        # Même TTL pour toutes les entrées : les expirées sont en tête
+        while self._completed:
+            key, (expires_at, _, _) = next(iter(self._completed.items()))
+            if expires_at > now:
+                break
+            del self._completed[key]
+
+    async def run(self, scope, key, fingerprint, handler):
+        """
+        Exécute `handler()` (coroutine) une seule fois par (scope, key).
+        `fingerprint` identifie le contenu de la requête : réutiliser une clé
+        avec un autre contenu lève IdempotencyKeyConflict.
+        """
+        entry_key = (scope, key)
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        if entry_key in self._completed:
+            _, stored_fingerprint, response = self._completed[entry_key]
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyConflict(key)
+            print(f"Requête rejouée depuis le stock d'idempotence ({scope}, {key}).")
+            return response
+
+        if entry_key in self._in_flight:
+            stored_fingerprint, future = self._in_flight[entry_key]
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyKeyConflict(key)
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[entry_key] = (fingerprint, future)
+        try:
+            response = await handler()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # Marque l'exception comme récupérée s'il n'y a pas de doublon en attente
+            raise
+        else:
+            future.set_result(response)
+            self._completed[entry_key] = (time.monotonic() + self.ttl, fingerprint, response)
+            while len(self._completed) > self.max_entries:
+                self._completed.popitem(last=False)
+            return response
+        finally:
+            del self._in_flight[entry_key]
+
+    def __len__(self):
+        return len(self._completed)
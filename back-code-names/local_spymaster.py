@@ -0,0 +1,44 @@
+import numpy as np
+
+from embeddings import WordEmbeddings
+from game_logic import normalize_word
+
+
+class LocalSpymaster:
+    """
+    Espion local : choisit l'indice dans le vocabulaire des vecteurs de mots,
+    sans appel à l'IA. Pour chaque mot candidat, les mots de l'équipe comptés
+    sont ceux plus proches de l'indice (de `margin`) que le mot adverse,
+    neutre ou assassin le plus proche ; le candidat qui en relie le plus gagne.
+    """
+
+    def __init__(self, embeddings=None, max_number=4, margin=0.05, vocab_limit=50000):
+        self.embeddings = embeddings if embeddings is not None else WordEmbeddings.load_default()
+        if not self.embeddings.words:
+            raise ValueError("L'espion local nécessite un fichier de vecteurs de mots (WORD_VECTORS_PATH).")
+        self.max_number = max_number
+        self.margin = margin
+        self.vocab = self.embeddings.matrix[:vocab_limit]
+        self.vocab_words = self.embeddings.words[:vocab_limit]
+
+    def give_clue(self, game):
+        """Retourne (mot-clé, nombre) pour le joueur actuel de la partie."""
+        targets = game._get_remaining_words(game.current_player)
+        target_set = set(targets)
+        others = [w for w in game._get_all_unrevealed_words() if w not in target_set]
+        target_sims = self.vocab @ self.embeddings.encode(targets).T
+        danger = (self.vocab @ self.embeddings.encode(others).T).max(axis=1) if others else np.zeros(len(self.vocab))
+
+        linked = target_sims > (danger + self.margin)[:, None]
+        counts = np.minimum(linked.sum(axis=1), self.max_number)
+        mean_linked = np.where(linked, target_sims, 0).sum(axis=1) / np.maximum(linked.sum(axis=1), 1)
+        scores = counts + mean_linked
+
+        # Un indice ne peut pas être un mot du plateau, ni le contenir ou y être contenu
+        board = [normalize_word(w) for row in game.word_matrix for w in row]
+        for i in np.argsort(-scores):
+            candidate = normalize_word(self.vocab_words[i])
+            if any(candidate in w or w in candidate for w in board):
+                continue
+            return self.vocab_words[i].upper(), max(int(counts[i]), 1)
+        return None
@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from game_logic import Game
+
+FSYNC_POLICIES = ("always", "batch", "never")
+# Âge au-delà duquel un fichier temporaire est considéré comme abandonné (crash, annulation)
+STALE_TEMP_AGE = 60.0
+
+
+class FileGameStore:
+    """
+    Stockage des parties en fichiers JSON (`<games_dir>/<id>.json`).
+    Toutes les E/S passent par un pool de threads dédié pour ne pas bloquer la
+    boucle asyncio. Chaque écriture va dans un fichier temporaire renommé
+    ensuite à sa place (os.replace) : un lecteur voit soit l'ancienne version,
+    soit la nouvelle, jamais un fichier tronqué.
+
+    Politique de fsync :
+    - 'always' : fsync du fichier avant le renommage, puis du répertoire.
+    - 'batch'  : commit groupé ; les écritures des `batch_interval` dernières
+                 secondes sont synchronisées, renommées puis validées par un
+                 seul fsync du répertoire. `save` rend la main après le commit.
+    - 'never'  : pas de fsync (atomique face à un crash du processus,
+                 pas face à une coupure de courant).
+    """
+
+    def __init__(self, games_dir, fsync_policy="always", max_workers=4, batch_interval=0.01):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Politique fsync inconnue : {fsync_policy} (attendu : {', '.join(FSYNC_POLICIES)})")
+        self.games_dir = games_dir
+        self.fsync_policy = fsync_policy
+        self.batch_interval = batch_interval
+        os.makedirs(games_dir, exist_ok=True)
+        self._remove_stale_temps()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="game-store")
+        # Commit groupé : {chemin final: (fichier temporaire, futures en attente)}
+        self._pending = {}
+        self._commit_task = None
+
+    @classmethod
+    def from_env(cls, games_dir):
+        """Construit le stockage à partir des variables d'environnement GAME_STORE_*."""
+        return cls(
+            games_dir,
+            fsync_policy=os.getenv("GAME_STORE_FSYNC", "always"),
+            max_workers=int(os.getenv("GAME_STORE_WORKERS", "4")),
+            batch_interval=float(os.getenv("GAME_STORE_BATCH_INTERVAL", "0.01")),
+        )
+
+    def path_for(self, game_id):
+        return os.path.join(self.games_dir, f"{game_id}.json")
+
+    async def _run(self, fn, *args):
+        # Le contexte (span courant) suit l'appel dans le thread du pool
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, fn, *args)
+
+    # --- Opérations bloquantes (exécutées dans le pool) ---
+
+    def _remove_stale_temps(self):
+        """Supprime les fichiers temporaires laissés par un processus arrêté en pleine écriture."""
+        # Seuls les anciens sont supprimés : un autre processus peut partager le répertoire
+        cutoff = time.time() - STALE_TEMP_AGE
+        removed = 0
+        for name in os.listdir(self.games_dir):
+            if not (name.startswith('.') and name.endswith('.tmp')):
+                continue
+            path = os.path.join(self.games_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            print(f"{removed} fichier(s) temporaire(s) abandonné(s) supprimé(s) de '{self.games_dir}'.")
+
+    @staticmethod
+    def _discard_temps(temp_paths):
+        for temp_path in temp_paths:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+
+    def _write_temp(self, game_id, data, fsync):
+        temp_path = os.path.join(self.games_dir, f".{game_id}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            self._discard_temps([temp_path])
+            raise
+        return temp_path
+
+    def _fsync_dir(self):
+        fd = os.open(self.games_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_atomic(self, game_id, data):
+        temp_path = self._write_temp(game_id, data, fsync=self.fsync_policy == "always")
+        try:
+            os.replace(temp_path, self.path_for(game_id))
+        except BaseException:
+            self._discard_temps([temp_path])
+            raise
+        if self.fsync_policy == "always":
+            self._fsync_dir()
+
+    def _commit_group(self, entries):
+        """fsync de tous les fichiers temporaires, renommages, puis un seul fsync du répertoire."""
+        for temp_path, final_path in entries:
+            fd = os.open(temp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for temp_path, final_path in entries:
+            os.replace(temp_path, final_path)
+        self._fsync_dir()
+
+    def _read(self, game_id):
+        try:
+            with open(self.path_for(game_id), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # --- API asynchrone ---
+
+    async def save(self, game):
+        """Sauvegarde la partie (sérialisée dans la boucle, écrite dans le pool)."""
+        data = game.to_json_string()
+        if self.fsync_policy != "batch":
+            await self._run(self._write_atomic, game.id_game, data)
+            return
+
+        write = asyncio.ensure_future(self._run(self._write_temp, game.id_game, data, False))
+        try:
+            temp_path = await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # Le thread finit d'écrire un fichier que personne n'enregistrera : on le supprime ensuite
+            write.add_done_callback(self._discard_written_temp)
+            raise
+        final_path = self.path_for(game.id_game)
+        future = asyncio.get_running_loop().create_future()
+        futures = [future]
+        # Une version plus récente de la même partie dans ce lot remplace l'ancienne
+        previous = self._pending.get(final_path)
+        if previous is not None:
+            futures = previous[1] + futures
+        self._pending[final_path] = (temp_path, futures)
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._group_commit())
+        if previous is not None:
+            await self._run(os.remove, previous[0])
+        await future
+
+    async def _group_commit(self):
+        while self._pending:
+            await asyncio.sleep(self.batch_interval)
+            pending, self._pending = self._pending, {}
+            entries = [(temp_path, final_path) for final_path, (temp_path, _) in pending.items()]
+            try:
+                await self._run(self._commit_group, entries)
+            except asyncio.CancelledError:
+                self._resolve(pending, asyncio.CancelledError())
+                raise
+            except Exception as e:
+                # Les fichiers pas encore renommés ne seront jamais validés
+                await self._run(self._discard_temps, [temp_path for temp_path, _ in entries])
+                self._resolve(pending, e)
+            else:
+                self._resolve(pending, None)
+
+    def _discard_written_temp(self, write):
+        if write.cancelled() or write.exception() is not None:
+            return
+        try:
+            self._executor.submit(self._discard_temps, [write.result()])
+        except RuntimeError: # Pool déjà arrêté (fermeture du stockage)
+            self._discard_temps([write.result()])
+
+    @staticmethod
+    def _resolve(pending, error):
+        # Une sauvegarde annulée (client déconnecté) a déjà sa future terminée
+        for _, futures in pending.values():
+            for future in futures:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    async def load(self, game_id):
+        """Charge une partie ; retourne None si elle n'existe pas ou si le fichier est illisible."""
+        json_data = await self._run(self._read, game_id)
+        if json_data is None:
+            return None
+        try:
+            return await self._run(Game.from_json_string, json_data)
+        except json.JSONDecodeError:
+            print(f"Erreur : Le fichier '{self.path_for(game_id)}' ne contient pas de JSON valide.")
+            return None
+
+    async def exists(self, game_id):
+        return await self._run(os.path.exists, self.path_for(game_id))
+
+    async def close(self):
+        """Termine le commit groupé en cours puis arrête le pool de threads."""
+        if self._commit_task is not None:
+            await self._commit_task
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,208 @@
+"""
+Traçage des requêtes (spans) avec propagation W3C `traceparent`.
+
+Le span racine est créé par requête HTTP (voir le middleware de game_api) ;
+la décision d'échantillonnage est prise à la racine (`TRACE_SAMPLE_RATE`) ou
+reprise du drapeau `sampled` de l'en-tête entrant. En dehors d'une trace
+échantillonnée, `span()` ne fait rien, ce qui garde un coût quasi nul.
+Les spans terminés sont exportés par un thread dédié, par lots, au format
+OTLP/JSON (une requête ExportTraceServiceRequest par ligne) dans un fichier
+local, comme le fait l'exportateur fichier du collecteur OpenTelemetry.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "sampled",
+                 "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, tracer, name, trace_id, parent_id, sampled, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            self.tracer._export(self)
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1, # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """Crée les spans et les exporte par lots dans `export_path` (OTLP/JSON, une ligne par lot)."""
+
+    def __init__(self, export_path="traces.jsonl", sample_rate=0.1, service_name="code-name",
+                 batch_size=64, flush_interval=1.0):
+        self.export_path = export_path
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Construit le traceur à partir des variables d'environnement TRACE_*."""
+        return cls(
+            export_path=os.getenv("TRACE_EXPORT_PATH", "traces.jsonl"),
+            sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.1")),
+            service_name=os.getenv("TRACE_SERVICE_NAME", "code-name"),
+        )
+
+    @contextlib.contextmanager
+    def trace(self, name, traceparent=None, **attributes):
+        """
+        Span racine d'une requête. Reprend le contexte d'un en-tête `traceparent`
+        valide, sinon démarre une nouvelle trace échantillonnée à `sample_rate`.
+        """
+        match = TRACEPARENT_RE.match(traceparent.strip().lower()) if traceparent else None
+        if match:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = int(match.group(3), 16) & 1 == 1
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < self.sample_rate
+        with self._activate(Span(self, name, trace_id, parent_id, sampled, attributes)) as root:
+            yield root
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """Span enfant du span courant ; sans trace échantillonnée en cours, ne fait rien."""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            yield None
+            return
+        with self._activate(Span(self, name, parent.trace_id, parent.span_id, True, attributes)) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def _activate(self, span):
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _export(self, span):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._export_loop, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(span)
+
+    def _export_loop(self):
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "code-name.tracing"}, "spans": [s.to_otlp() for s in batch]}],
+        }]}
+        try:
+            with open(self.export_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(request) + "\n")
+        except OSError as e:
+            print(f"Erreur lors de l'export des spans : {e}")
+
+    def shutdown(self):
+        """Exporte les spans restants et arrête le thread d'export."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+
+tracer = Tracer.from_env()
+
+
+def span(name, **attributes):
+    """Raccourci : span enfant du span courant, avec le traceur global."""
+    return tracer.span(name, **attributes)
+
+
+def current_trace_id():
+    """Identifiant de la trace courante, ou None hors trace."""
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+def traced(name):
+    """Décorateur : exécute la fonction dans un span `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
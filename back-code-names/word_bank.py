@@ -0,0 +1,271 @@
+"""
+Génération des plateaux côté serveur à partir d'une banque de mots.
+
+La banque (data/word_bank.txt, ou WORD_BANK_PATH) est chargée une fois et
+indexée : une liste de mots dédoublonnés sur leur forme normalisée, et pour
+chaque thème la liste des indices de ses mots. Un tirage de k mots sans
+remise coûte O(k) tirages d'indices, sans copier ni mélanger la banque.
+
+Pour qu'une même session ne revoie pas les mots de ses dernières parties,
+chaque session garde un filtre de Bloom des mots déjà tirés (quelques
+centaines d'octets par session, faux positifs seulement : un mot jamais vu
+peut être écarté à tort, un mot déjà vu n'est jamais repris).
+"""
+import hashlib
+import math
+import os
+import random
+import unicodedata
+from collections import OrderedDict
+
+from game_logic import normalize_word
+
+DEFAULT_WORD_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "word_bank.txt")
+
+
+def normalize_card(word):
+    """Forme affichée d'un mot de plateau : espaces réduits, majuscules, composée (NFC : FORÊT)."""
+    return unicodedata.normalize('NFC', " ".join(word.split())).upper()
+
+
+def validate_deck(cards, board_size):
+    """
+    Normalise les mots envoyés par le client pour un plateau board_size x board_size.
+    Les mots vides et les doublons (casse et accents ignorés, FORÊT = foret) sont
+    retirés : le front complète les listes trop courtes avec un mot de remplissage
+    répété. Les cartes manquantes sont ensuite tirées de la banque
+    (DeckGenerator.generate). Lève ValueError s'il reste plus de board_size² mots.
+    """
+    deck = []
+    seen = set()
+    for word in map(normalize_card, cards):
+        key = normalize_word(word)
+        if not word or key in seen:
+            continue
+        seen.add(key)
+        deck.append(word)
+    if len(deck) > board_size * board_size:
+        raise ValueError(
+            f"Trop de mots pour un plateau {board_size}x{board_size} : "
+            f"{len(deck)} mots distincts pour {board_size * board_size} cases."
+        )
+    if len(deck) < len(cards):
+        print(f"{len(cards) - len(deck)} mot(s) vide(s) ou en double retiré(s) du plateau.")
+    return deck
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur des chaînes : tableau de bits dimensionné pour
+    `capacity` éléments avec un taux de faux positifs `error_rate`, positions
+    obtenues par double hachage d'un condensat blake2b.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class RecentWords:
+    """
+    Mots des dernières parties d'une session, en deux générations de filtres :
+    quand la génération courante a reçu `games_per_generation` plateaux, elle
+    devient la précédente et l'ancienne précédente est oubliée. Un mot reste
+    donc écarté pendant au moins `games_per_generation` parties.
+    Les filtres sont dimensionnés pour le plus grand plateau vu : un plateau
+    plus grand ouvre une nouvelle génération à la bonne taille, au lieu de
+    surcharger le filtre courant (et de faire grimper les faux positifs).
+    """
+
+    def __init__(self, games_per_generation=10, words_per_game=25, error_rate=0.01):
+        self.games_per_generation = games_per_generation
+        self._capacity = games_per_generation * words_per_game
+        self._error_rate = error_rate
+        self._current = BloomFilter(self._capacity, error_rate)
+        self._previous = None
+        self._games = 0
+
+    def _rotate(self):
+        self._previous = self._current
+        self._current = BloomFilter(self._capacity, self._error_rate)
+        self._games = 0
+
+    def add_deck(self, words):
+        needed = self.games_per_generation * len(words)
+        if needed > self._capacity:
+            self._capacity = needed
+            self._rotate()
+        elif self._games >= self.games_per_generation:
+            self._rotate()
+        for word in words:
+            self._current.add(normalize_word(word))
+        self._games += 1
+
+    def __contains__(self, key):
+        """`key` est une forme normalisée (normalize_word)."""
+        return key in self._current or (self._previous is not None and key in self._previous)
+
+
+class WordBank:
+    """Banque de mots indexée, avec sous-ensembles par thème."""
+
+    def __init__(self, themes):
+        """`themes` : dict thème -> mots. Un mot présent dans plusieurs thèmes n'est stocké qu'une fois."""
+        self.words = []
+        self._keys = []
+        self._index = {}
+        self.themes = {}
+        self.theme_names = {}
+        for theme, words in themes.items():
+            theme_key = normalize_word(theme)
+            self.theme_names.setdefault(theme_key, theme)
+            indices = self.themes.setdefault(theme_key, [])
+            for word in words:
+                word = normalize_card(word)
+                if not word:
+                    continue
+                key = normalize_word(word)
+                i = self._index.get(key)
+                if i is None:
+                    i = self._index[key] = len(self.words)
+                    self.words.append(word)
+                    self._keys.append(key)
+                if i not in indices:
+                    indices.append(i)
+
+    @classmethod
+    def from_file(cls, path):
+        """Charge un fichier de sections '[thème]' suivies de mots séparés par des espaces ('#' : commentaire)."""
+        themes = {}
+        current = themes.setdefault("divers", [])
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                if line.startswith('[') and line.endswith(']'):
+                    current = themes.setdefault(line[1:-1].strip(), [])
+                else:
+                    current.extend(line.split())
+        bank = cls({theme: words for theme, words in themes.items() if words})
+        print(f"Banque de {len(bank.words)} mots chargée depuis '{path}' ({len(bank.themes)} thèmes).")
+        return bank
+
+    @classmethod
+    def load_default(cls):
+        return cls.from_file(os.getenv("WORD_BANK_PATH", DEFAULT_WORD_BANK_PATH))
+
+    def __len__(self):
+        return len(self.words)
+
+    def sample(self, count, theme=None, exclude=None, forbidden=(), rng=random):
+        """
+        Tire `count` mots distincts, uniformément et sans remise, dans toute la
+        banque ou dans un thème. Les mots dont la forme normalisée est dans
+        `exclude` sont écartés tant que c'est possible ; si le thème est trop
+        petit pour les éviter tous, le tirage est complété avec eux. Ceux de
+        `forbidden` (mots déjà sur le plateau) ne sont jamais tirés.
+        """
+        if theme is None:
+            pool = None
+            size = len(self.words)
+        else:
+            pool = self.themes.get(normalize_word(theme))
+            if pool is None:
+                raise ValueError(f"Thème inconnu : '{theme}'. Thèmes disponibles : {', '.join(sorted(self.theme_names.values()))}.")
+            size = len(pool)
+        if count > size:
+            raise ValueError(f"La banque ne contient que {size} mots pour ce thème, {count} demandés.")
+
+        chosen = []
+        taken = set()
+        # Rejets bornés : O(count) tirages tant que la majorité des mots restent libres
+        attempts = 0
+        max_attempts = count * 20
+        while len(chosen) < count and attempts < max_attempts:
+            attempts += 1
+            r = rng.randrange(size)
+            i = r if pool is None else pool[r]
+            key = self._keys[i]
+            if i in taken or key in forbidden or (exclude is not None and key in exclude):
+                continue
+            taken.add(i)
+            chosen.append(i)
+
+        if len(chosen) < count:
+            # Thème presque épuisé pour cette session : on complète avec les mots restants
+            remaining = [i for i in (pool if pool is not None else range(size))
+                         if i not in taken and self._keys[i] not in forbidden]
+            fresh = [i for i in remaining if exclude is None or self._keys[i] not in exclude]
+            stale = [i for i in remaining if exclude is not None and self._keys[i] in exclude]
+            missing = count - len(chosen)
+            if missing > len(remaining):
+                raise ValueError(f"La banque ne contient pas assez de mots pour ce thème ({count} demandés).")
+            picked = rng.sample(fresh, min(missing, len(fresh)))
+            chosen.extend(picked)
+            chosen.extend(rng.sample(stale, missing - len(picked)))
+
+        return [self.words[i] for i in chosen]
+
+
+class DeckGenerator:
+    """
+    Plateaux tirés de la banque de mots, en évitant les mots des parties
+    récentes de la même session. Les filtres de session sont bornés
+    (`max_sessions`, les moins récemment utilisés sont oubliés).
+    """
+
+    def __init__(self, bank, recent_games=10, max_sessions=10000):
+        self.bank = bank
+        self.recent_games = recent_games
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+
+    @classmethod
+    def from_env(cls):
+        """Construit le générateur à partir des variables d'environnement WORD_BANK_PATH et DECK_*."""
+        return cls(
+            WordBank.load_default(),
+            recent_games=int(os.getenv("DECK_RECENT_GAMES", "10")),
+            max_sessions=int(os.getenv("DECK_MAX_SESSIONS", "10000")),
+        )
+
+    def _recent_words(self, session_id, words_per_game):
+        recent = self._sessions.get(session_id)
+        if recent is None:
+            recent = self._sessions[session_id] = RecentWords(self.recent_games, words_per_game)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return recent
+
+    def generate(self, count, theme=None, session_id=None, cards=()):
+        """
+        Retourne `count` mots distincts : les `cards` déjà choisies (normalisées,
+        voir validate_deck), complétées par des mots de la banque.
+        Lève ValueError si le thème est inconnu ou trop petit.
+        """
+        deck = list(cards)
+        recent = self._recent_words(session_id, count) if session_id else None
+        forbidden = {normalize_word(w) for w in deck}
+        deck += self.bank.sample(count - len(deck), theme, exclude=recent, forbidden=forbidden)
+        if recent is not None:
+            recent.add_deck(deck)
+        return deck